@@ -6,6 +6,8 @@ without importing FastMCP dependencies.
 """
 
 import os
+import re
+from collections.abc import Iterable
 from typing import Any
 
 
@@ -38,6 +40,17 @@ def env_exclusion_list_display(name: str) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def normalize_exclusion_list(values: Iterable[str] | None) -> list[str]:
+    """Normalize exclusion values passed in directly (e.g. as tool arguments).
+
+    Applies the same rules as env_exclusion_list(): values are stripped and
+    lowercased, and empty or whitespace-only values are dropped.
+    """
+    if not values:
+        return []
+    return [item.strip().lower() for item in values if item and item.strip()]
+
+
 def matches_exclusion(value: str, exclusion_list: list[str]) -> bool:
     """Check if a value matches any exclusion in the list.
 
@@ -52,7 +65,88 @@ def matches_exclusion(value: str, exclusion_list: list[str]) -> bool:
     return any(exclusion in normalized_value for exclusion in normalized_exclusions)
 
 
-def should_exclude_transaction(transaction: dict[str, Any]) -> bool:
+class ExclusionMatcher:
+    """Category and tag exclusions compiled for matching many transactions.
+
+    Each exclusion list becomes one combined regex, so a value is checked
+    against every pattern in a single pass. Verdicts are cached per distinct
+    value: exports repeat a few hundred categories and tags across all rows,
+    so most rows are answered by a dict lookup.
+
+    Build one per load (``from_env``) rather than per row.
+    """
+
+    __slots__ = (
+        "categories",
+        "tags",
+        "_category_pattern",
+        "_tag_pattern",
+        "_category_verdicts",
+        "_tag_verdicts",
+    )
+
+    def __init__(self, categories: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        self.categories = [category.lower() for category in categories]
+        self.tags = [tag.lower() for tag in tags]
+        self._category_pattern = _compile(self.categories)
+        self._tag_pattern = _compile(self.tags)
+        self._category_verdicts: dict[str, bool] = {}
+        self._tag_verdicts: dict[str, bool] = {}
+
+    @classmethod
+    def from_env(cls) -> "ExclusionMatcher":
+        """Build a matcher from EXCLUDED_CATEGORIES and EXCLUDED_TAGS."""
+        return cls(env_exclusion_list("EXCLUDED_CATEGORIES"), env_exclusion_list("EXCLUDED_TAGS"))
+
+    def __bool__(self) -> bool:
+        return self._category_pattern is not None or self._tag_pattern is not None
+
+    def matches_category(self, value: str) -> bool:
+        """Check a category, subcategory or category path against the category exclusions."""
+        if not value:
+            return False
+        verdict = self._category_verdicts.get(value)
+        if verdict is None:
+            verdict = _search(self._category_pattern, value)
+            self._category_verdicts[value] = verdict
+        return verdict
+
+    def matches_tag(self, value: str) -> bool:
+        """Check a single tag against the tag exclusions."""
+        if not value:
+            return False
+        verdict = self._tag_verdicts.get(value)
+        if verdict is None:
+            verdict = _search(self._tag_pattern, value)
+            self._tag_verdicts[value] = verdict
+        return verdict
+
+    def excludes(self, transaction: Any) -> bool:
+        """Check a transaction (``Transaction`` or dict) against both exclusion lists."""
+        if self._category_pattern is not None and (
+            self.matches_category(transaction.get("category", ""))
+            or self.matches_category(transaction.get("subcategory", ""))
+            or self.matches_category(transaction.get("category_path", ""))
+        ):
+            return True
+        if self._tag_pattern is not None:
+            return any(self.matches_tag(tag) for tag in transaction.get("tags", ()) or ())
+        return False
+
+
+def _compile(exclusions: list[str]) -> re.Pattern[str] | None:
+    if not exclusions:
+        return None
+    return re.compile("|".join(re.escape(exclusion) for exclusion in exclusions))
+
+
+def _search(pattern: re.Pattern[str] | None, value: str) -> bool:
+    return pattern is not None and pattern.search(value.lower()) is not None
+
+
+def should_exclude_transaction(
+    transaction: dict[str, Any], matcher: ExclusionMatcher | None = None
+) -> bool:
     """Check if a transaction should be excluded based on category or tag filters.
 
     A transaction is excluded if:
@@ -65,31 +159,12 @@ def should_exclude_transaction(transaction: dict[str, Any]) -> bool:
     Args:
         transaction: Normalized transaction dictionary with 'category', 'subcategory',
                      'category_path', and 'tags' fields
+        matcher: Compiled exclusions to check against. Built from the environment
+                 when omitted; pass one in when checking many transactions.
 
     Returns:
         True if the transaction should be excluded, False otherwise
     """
-    excluded_categories = env_exclusion_list("EXCLUDED_CATEGORIES")
-    excluded_tags = env_exclusion_list("EXCLUDED_TAGS")
-
-    # Check category exclusion - check category, subcategory, and category_path
-    if excluded_categories:
-        category = transaction.get("category", "")
-        subcategory = transaction.get("subcategory", "")
-        category_path = transaction.get("category_path", "")
-
-        if category and matches_exclusion(category, excluded_categories):
-            return True
-        if subcategory and matches_exclusion(subcategory, excluded_categories):
-            return True
-        if category_path and matches_exclusion(category_path, excluded_categories):
-            return True
-
-    # Check tag exclusion
-    tags = transaction.get("tags", [])
-    if tags:
-        for tag in tags:
-            if matches_exclusion(tag, excluded_tags):
-                return True
-
-    return False
+    if matcher is None:
+        matcher = ExclusionMatcher.from_env()
+    return matcher.excludes(transaction)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the Outbank date and amount parsers.
+
+Compares the original parsers (try every strptime format in order, several
+string copies per amount) with the fixed-width fast paths plus the per-load
+ParseCache used by the CSV loader. Prints rows/sec for each variant.
+
+Usage:
+    uv run python scripts/benchmark-parsers.py [--rows 200000] [--distinct-dates 3000]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from mcp_outbank.ingest import ParseCache, parse_cents, parse_date
+
+
+def legacy_parse_amount(value: Any) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().replace(" ", "")
+        if cleaned == "":
+            return None
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def legacy_parse_date(value: Any) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        for fmt in (
+            "%Y-%m-%d",
+            "%Y-%m-%dT%H:%M:%S",
+            "%Y-%m-%dT%H:%M:%S.%f",
+            "%d.%m.%Y",
+        ):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+def format_date(value: date | None) -> str | None:
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def make_rows(count: int, distinct_dates: int) -> list[tuple[str, str]]:
+    rng = random.Random(42)
+    start = date(2016, 1, 1)
+    dates = [
+        (start + timedelta(days=offset)).strftime("%d.%m.%Y") for offset in range(distinct_dates)
+    ]
+    rows = []
+    for _ in range(count):
+        cents = rng.randint(-250_000, 250_000)
+        euros, rest = divmod(abs(cents), 100)
+        amount = f"{'-' if cents < 0 else ''}{euros:,}".replace(",", ".") + f",{rest:02d}"
+        rows.append((rng.choice(dates), amount))
+    return rows
+
+
+def bench(label: str, rows: list[tuple[str, str]], parse_row: Any) -> float:
+    started = time.perf_counter()
+    for booking_date, amount in rows:
+        parse_row(booking_date, amount)
+    elapsed = time.perf_counter() - started
+    rate = len(rows) / elapsed
+    print(f"{label:<28} {elapsed:8.3f}s  {rate:>12,.0f} rows/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--distinct-dates", type=int, default=3_000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.distinct_dates)
+    print(f"{args.rows:,} rows, {args.distinct_dates:,} distinct dates\n")
+
+    before = bench(
+        "before (strptime chain)",
+        rows,
+        lambda d, a: (format_date(legacy_parse_date(d)), legacy_parse_amount(a)),
+    )
+    bench("fast paths, no memo", rows, lambda d, a: (format_date(parse_date(d)), parse_cents(a)))
+    cache = ParseCache()
+    after = bench("fast paths + ParseCache", rows, lambda d, a: (cache.date(d), cache.amount(a)))
+    print(f"\nspeedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
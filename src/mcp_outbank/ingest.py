@@ -0,0 +1,599 @@
+"""CSV ingestion: decompression, parsing, normalization and per-file fingerprints.
+
+Kept free of FastMCP imports so it can be tested in isolation and imported
+cheaply by ingestion worker processes.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from datetime import date, datetime
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+from .store import MISSING_DATE, Transaction, TransactionStore
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class FileFingerprint(NamedTuple):
+    """Identity of a CSV file's contents at load time."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class ParsedFile(NamedTuple):
+    """Rows parsed from one CSV file, held in a store of their own."""
+
+    store: TransactionStore
+    total_parsed: int
+    timings: dict[str, float] | None = None
+
+
+class LoadedFile(NamedTuple):
+    """Registry entry for a file whose rows live in the store.
+
+    ``start``/``stop`` delimit the file's contiguous row range in the store
+    (excluded rows included); ``duplicate_count`` counts rows collapsed into
+    earlier exports.
+    """
+
+    fingerprint: FileFingerprint
+    start: int
+    stop: int
+    total_parsed: int
+    duplicate_count: int = 0
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as handle:
+        while chunk := handle.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: Path, previous: FileFingerprint | None = None) -> FileFingerprint:
+    """Fingerprint a file, skipping the content hash when size and mtime are unchanged."""
+    stat = path.stat()
+    if (
+        previous is not None
+        and previous.size == stat.st_size
+        and previous.mtime_ns == stat.st_mtime_ns
+    ):
+        return previous
+    return FileFingerprint(stat.st_size, stat.st_mtime_ns, hash_file(path))
+
+
+def same_content(current: FileFingerprint, previous: FileFingerprint) -> bool:
+    """True when two fingerprints describe the same bytes (mtime may differ)."""
+    return current.size == previous.size and current.digest == previous.digest
+
+
+def parse_cents(value: Any) -> int | None:
+    """Parse an amount ("-1.234,56" in Outbank exports) to integer cents."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float):
+        return round(value * 100)
+    if isinstance(value, str):
+        # Fast path for the common Outbank shape "-13,11"
+        whole, _, fraction = value.partition(",")
+        if len(fraction) == 2 and fraction.isdigit() and fraction.isascii():
+            negative = whole.startswith("-")
+            digits = whole[1:] if negative or whole.startswith("+") else whole
+            if digits.isdigit() and digits.isascii():
+                cents = int(digits) * 100 + int(fraction)
+                return -cents if negative else cents
+        cleaned = value.strip().replace(" ", "")
+        if cleaned == "":
+            return None
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+        try:
+            return int((Decimal(cleaned) * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+        except (InvalidOperation, ValueError, OverflowError):
+            return None
+    return None
+
+
+def _parse_fixed_width_date(value: str) -> date | None:
+    """Slice ``DD.MM.YYYY`` (Outbank) or ``YYYY-MM-DD`` without trying formats.
+
+    Raises ValueError when the value is not in one of those fixed-width layouts.
+    """
+    if len(value) != 10 or not value.isascii():
+        raise ValueError(value)
+    if value[2] == "." and value[5] == ".":
+        day, month, year = value[:2], value[3:5], value[6:]
+    elif value[4] == "-" and value[7] == "-":
+        year, month, day = value[:4], value[5:7], value[8:]
+    else:
+        raise ValueError(value)
+    if not (day.isdigit() and month.isdigit() and year.isdigit()):
+        raise ValueError(value)
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        # Right layout but not a real calendar date (e.g. 31.02.2026)
+        return None
+
+
+def parse_date(value: Any) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        try:
+            return _parse_fixed_width_date(value)
+        except ValueError:
+            pass
+        for fmt in (
+            "%Y-%m-%d",
+            "%Y-%m-%dT%H:%M:%S",
+            "%Y-%m-%dT%H:%M:%S.%f",
+            "%d.%m.%Y",
+        ):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+class ParseCache:
+    """Per-load memo of parsed date and amount strings.
+
+    An export holds a few thousand distinct dates (and far fewer distinct
+    amounts than rows), so most lookups are dict hits instead of parses.
+    """
+
+    __slots__ = ("dates", "amounts")
+
+    def __init__(self) -> None:
+        self.dates: dict[Any, int] = {}
+        self.amounts: dict[Any, int | None] = {}
+
+    def date(self, value: Any) -> int:
+        """Parse a raw date cell to a date ordinal (``MISSING_DATE`` if unparseable)."""
+        try:
+            return self.dates[value]
+        except KeyError:
+            parsed = parse_date(value)
+            ordinal = parsed.toordinal() if parsed is not None else MISSING_DATE
+            self.dates[value] = ordinal
+            return ordinal
+
+    def amount(self, value: Any) -> int | None:
+        """Parse a raw amount cell to integer cents (see ``parse_cents``)."""
+        try:
+            return self.amounts[value]
+        except KeyError:
+            parsed = parse_cents(value)
+            self.amounts[value] = parsed
+            return parsed
+
+
+EXPECTED_HEADERS = [
+    "#",
+    "Account",
+    "Date",
+    "Value Date",
+    "Amount",
+    "Currency",
+    "Name",
+    "Number",
+    "Bank",
+    "Reason",
+    "Category",
+    "Subcategory",
+    "Category-Path",
+    "Tags",
+    "Note",
+    "Posting Text",
+]
+
+
+def validate_headers(fieldnames: list[str] | None, source_file: str) -> None:
+    if not fieldnames:
+        raise ValueError(f"{source_file} has no headers")
+    missing = [header for header in EXPECTED_HEADERS if header not in fieldnames]
+    if missing:
+        missing_list = ", ".join(missing)
+        raise ValueError(f"{source_file} is missing headers: {missing_list}")
+
+
+def split_tags(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    text = str(value).strip()
+    if not text:
+        return []
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def header_positions(fieldnames: list[str]) -> tuple[int, ...]:
+    """Resolve the position of each ``EXPECTED_HEADERS`` column once per file.
+
+    A repeated header name resolves to its last occurrence, like ``csv.DictReader``.
+    """
+    positions = {name: index for index, name in enumerate(fieldnames)}
+    return tuple(positions[name] for name in EXPECTED_HEADERS)
+
+
+def normalize_transaction(
+    values: list[str],
+    positions: tuple[int, ...],
+    source_file: str,
+    row_index: int,
+    cache: ParseCache | None = None,
+) -> Transaction:
+    """Build a normalized transaction record from a raw CSV row list.
+
+    ``positions`` comes from ``header_positions``; cells missing from short
+    rows read as empty.
+    """
+    if cache is None:
+        cache = ParseCache()
+    width = max(positions) + 1
+    if len(values) < width:
+        values = values + [""] * (width - len(values))
+    (
+        raw_id,
+        account,
+        raw_booking_date,
+        raw_value_date,
+        raw_amount,
+        currency,
+        name,
+        number,
+        bank,
+        reason,
+        category,
+        subcategory,
+        category_path,
+        raw_tags,
+        note,
+        posting_text,
+    ) = [values[position] for position in positions]
+
+    return Transaction(
+        raw_id.strip() or str(row_index),
+        account.strip(),
+        cache.date(raw_booking_date),
+        cache.date(raw_value_date),
+        cache.amount(raw_amount),
+        currency.strip(),
+        name.strip(),
+        number.strip(),
+        bank.strip(),
+        reason.strip(),
+        category.strip(),
+        subcategory.strip(),
+        category_path.strip(),
+        tuple(split_tags(raw_tags)),
+        note.strip(),
+        posting_text.strip(),
+        source_file,
+    )
+
+
+class IngestCounters:
+    """Row counts collected while a file streams through the pipeline."""
+
+    __slots__ = ("total_parsed",)
+
+    def __init__(self) -> None:
+        self.total_parsed = 0
+
+
+class CsvRows(NamedTuple):
+    """Validated header positions plus ``(row_index, values)`` for the data rows."""
+
+    positions: tuple[int, ...]
+    rows: Iterator[tuple[int, list[str]]]
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def open_sources(file_path: Path) -> Iterator[tuple[str, IO[str]]]:
+    """Yield ``(source name, text stream)`` for each CSV export inside a file.
+
+    Plain ``.csv`` files yield themselves; ``.gz`` and ``.zst`` files are
+    decompressed on the fly, and ``.zip`` archives yield each ``.csv`` member
+    (named ``archive.zip/member.csv``) in name order. Nothing is extracted to
+    disk. Each stream is closed once the consumer moves on to the next one.
+    """
+    suffix = file_path.suffix.lower()
+    if suffix == ".zip":
+        with zipfile.ZipFile(file_path) as archive:
+            members = sorted(
+                name
+                for name in archive.namelist()
+                if name.lower().endswith(".csv") and not name.startswith("__MACOSX/")
+            )
+            for member in members:
+                with archive.open(member) as raw:
+                    yield f"{file_path.name}/{member}", _text_stream(raw)
+    elif suffix == ".gz":
+        with gzip.open(file_path, "rb") as raw:
+            yield file_path.name, _text_stream(raw)
+    elif suffix == ".zst":
+        if zstandard is None:
+            raise ValueError(f"{file_path.name} is zstd-compressed but zstandard is not installed")
+        with file_path.open("rb") as compressed:
+            with zstandard.ZstdDecompressor().stream_reader(compressed) as raw:
+                yield file_path.name, _text_stream(raw)
+    else:
+        with file_path.open("r", encoding="utf-8-sig", newline="") as handle:
+            yield file_path.name, handle
+
+
+def _text_stream(raw: IO[bytes]) -> IO[str]:
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+def read_rows(handle: IO[str], source_file: str) -> CsvRows:
+    """Validate a CSV export's header and stream its non-blank rows.
+
+    Rows are plain lists from ``csv.reader``; row numbering and blank-row
+    skipping match ``csv.DictReader``: empty lines are not counted, and rows
+    whose cells are all empty are counted but skipped.
+    """
+    reader = csv.reader(handle, delimiter=";")
+    fieldnames = next(reader, None)
+    validate_headers(fieldnames, source_file)
+    return CsvRows(header_positions(fieldnames), _data_rows(reader, len(fieldnames)))
+
+
+def _data_rows(reader: Iterator[list[str]], width: int) -> Iterator[tuple[int, list[str]]]:
+    row_index = 0
+    for row in reader:
+        if not row:
+            continue
+        row_index += 1
+        # DictReader gathers surplus cells into a list, which counts as a value
+        if len(row) <= width and not any(row):
+            continue
+        yield row_index, row
+
+
+def normalize_rows(
+    csv_rows: CsvRows, source_file: str, counters: IngestCounters
+) -> Iterator[Transaction]:
+    cache = ParseCache()
+    positions = csv_rows.positions
+    for row_index, values in csv_rows.rows:
+        counters.total_parsed += 1
+        yield normalize_transaction(values, positions, source_file, row_index, cache)
+
+
+# Pipeline stages in upstream-to-downstream order, as reported by profiling
+STAGES = ("read", "parse", "normalize")
+
+
+def _timed(items: Iterable[Any], timings: dict[str, float], stage: str) -> Iterator[Any]:
+    """Yield from ``items``, adding the time spent producing them to ``timings[stage]``.
+
+    Stages are nested generators, so this is cumulative: it includes the
+    time of every stage upstream (see ``_stage_self_times``).
+    """
+    iterator = iter(items)
+    clock = time.perf_counter
+    elapsed = 0.0
+    try:
+        while True:
+            started = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            elapsed += clock() - started
+            yield item
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def _stage_self_times(timings: dict[str, float]) -> None:
+    """Turn cumulative ``_timed`` totals into time spent in each stage alone.
+
+    Also puts the stages in pipeline order, followed by ``store``.
+    """
+    upstream = 0.0
+    self_times: dict[str, float] = {}
+    for stage in STAGES:
+        cumulative = timings.get(stage, 0.0)
+        self_times[stage] = max(0.0, cumulative - upstream)
+        upstream = max(upstream, cumulative)
+    self_times["store"] = timings.get("store", 0.0)
+    timings.clear()
+    timings.update(self_times)
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    chunk: list[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_file(
+    file_path: Path,
+    store: TransactionStore,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timings: dict[str, float] | None = None,
+) -> int:
+    """Stream one export file into the store: read -> normalize -> append.
+
+    Compressed files and archives are decompressed as they are read (see
+    ``open_sources``). Only ``chunk_size`` normalized rows are held at a
+    time, so peak memory while loading is the store plus one chunk.
+
+    When ``timings`` is given it is filled with the seconds spent in each of
+    ``STAGES`` plus ``store`` (appending to the columns). Timing every row
+    adds overhead, so this is only done when profiling.
+
+    Exclusion filters and record-key dedup are not applied here: every row is
+    stored, and excluded rows and repeated record keys are hidden afterwards
+    by the store's exclusion mask. Which copy of a repeated key is shown
+    depends on the exclusions, so dropping copies here would let an excluded
+    row shadow a visible one.
+
+    Returns:
+        Number of data rows parsed
+    """
+    counters = IngestCounters()
+    size = max(1, chunk_size)
+    with closing(open_sources(file_path)) as sources:
+        for source_file, handle in sources:
+            if timings is None:
+                rows = read_rows(handle, source_file)
+                transactions = normalize_rows(rows, source_file, counters)
+                for chunk in chunked(transactions, size):
+                    store.extend_rows(chunk)
+                continue
+
+            rows = read_rows(_timed(handle, timings, "read"), source_file)
+            rows = rows._replace(rows=_timed(rows.rows, timings, "parse"))
+            transactions = _timed(normalize_rows(rows, source_file, counters), timings, "normalize")
+            for chunk in chunked(transactions, size):
+                started = time.perf_counter()
+                store.extend_rows(chunk)
+                timings["store"] = timings.get("store", 0.0) + time.perf_counter() - started
+    if timings is not None:
+        _stage_self_times(timings)
+    return counters.total_parsed
+
+
+class ContentIndex:
+    """Multiset of row content fingerprints from the files loaded so far.
+
+    Overlapping exports (a monthly file inside a yearly one) repeat the same
+    transactions under different record keys. Files are collapsed in load
+    order: a row is dropped when earlier files already hold as many rows with
+    the same content, so the first file wins and genuine repeats within one
+    export (two identical coffees on a day) are kept. A row repeating an
+    earlier row's record key is not counted as a repeat; it is kept or
+    dropped along with that row (the store hides it either way).
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts: dict[tuple[Any, ...], int] = {}
+
+    def collapse(self, store: TransactionStore, start: int) -> int:
+        """Drop the rows of ``store[start:]`` already present in earlier files.
+
+        Returns:
+            Number of rows dropped, not counting repeated record keys
+        """
+        counts = self.counts
+        in_file: dict[tuple[Any, ...], int] = {}
+        # Record key -> whether its first row in this file was kept
+        first_kept: dict[tuple[int, str], bool] = {}
+        kept: list[int] = []
+        dropped = 0
+        source_files, ids = store.source_files, store.ids
+        for index in range(start, len(store)):
+            record = (source_files[index], ids[index])
+            earlier = first_kept.get(record)
+            if earlier is not None:
+                if earlier:
+                    kept.append(index)
+                continue
+            key = store.content_key(index)
+            seen = in_file.get(key, 0) + 1
+            in_file[key] = seen
+            keep = seen > counts.get(key, 0)
+            first_kept[record] = keep
+            if keep:
+                kept.append(index)
+            else:
+                dropped += 1
+        for key, seen in in_file.items():
+            if seen > counts.get(key, 0):
+                counts[key] = seen
+
+        if len(kept) != len(store) - start:
+            store.retain(start, kept)
+        return dropped
+
+    def add_collapsed(self, store: TransactionStore, start: int, stop: int) -> None:
+        """Record rows that were already collapsed against the current index.
+
+        Used for files reused from a previous load: each surviving row is one
+        occurrence beyond what earlier files hold (repeated record keys are
+        skipped, as in ``collapse``).
+        """
+        counts = self.counts
+        records: set[tuple[int, str]] = set()
+        source_files, ids = store.source_files, store.ids
+        for index in range(start, stop):
+            record = (source_files[index], ids[index])
+            if record in records:
+                continue
+            records.add(record)
+            key = store.content_key(index)
+            counts[key] = counts.get(key, 0) + 1
+
+
+def parse_file(file_path: Path, profile: bool = False) -> ParsedFile:
+    """Parse one CSV file into its own store (the unit of work for worker processes)."""
+    store = TransactionStore()
+    timings: dict[str, float] | None = {} if profile else None
+    total_parsed = load_file(file_path, store, timings=timings)
+    return ParsedFile(store, total_parsed, timings)
+
+
+def parse_files(
+    file_paths: list[Path], workers: int = 1, profile: bool = False
+) -> Iterator[ParsedFile]:
+    """Parse files in order, fanning out to worker processes when ``workers > 1``.
+
+    Results are yielded in the order of ``file_paths`` regardless of which
+    worker finishes first, so callers can merge them deterministically. Each
+    result holds one whole file, so in-process loading should stream through
+    ``load_file`` instead.
+    """
+    if workers <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield parse_file(file_path, profile)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+        yield from executor.map(partial(parse_file, profile=profile), file_paths)
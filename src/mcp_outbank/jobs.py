@@ -0,0 +1,102 @@
+"""Single-flight background jobs for long-running reloads.
+
+A reload can take seconds. ``SingleFlight`` runs it on a background thread
+so the MCP event loop stays free, and lets concurrent callers share the
+run that is already in flight instead of queueing up another one. Each run
+is a ``Job`` with an id that callers can poll.
+
+Kept free of FastMCP imports so it can be tested and reused in isolation.
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+
+class Job:
+    """One run of a ``SingleFlight`` function, shared by every caller that joined it."""
+
+    __slots__ = ("id", "started_at", "finished_at", "future")
+
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self.future: Future[Any] = Future()
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return "cancelled"
+        if not self.future.done():
+            return "running"
+        return "failed" if self.future.exception() is not None else "succeeded"
+
+    def describe(self) -> dict[str, Any]:
+        """Summarize the job for status responses (id, status, timing, result or error)."""
+        info: dict[str, Any] = {
+            "job_id": self.id,
+            "status": self.status,
+            "started_at": round(self.started_at, 3),
+        }
+        if self.finished_at is not None and not self.future.cancelled():
+            info["seconds"] = round(self.finished_at - self.started_at, 4)
+            error = self.future.exception()
+            if error is not None:
+                info["error"] = str(error)
+            else:
+                info["result"] = self.future.result()
+        return info
+
+
+class SingleFlight:
+    """Run ``fn`` on a background thread, at most once at a time.
+
+    ``submit`` starts a run unless one is already in flight, in which case
+    the caller joins it and gets the same result (or exception). A job's
+    future is marked running before the run starts, so a caller that stops
+    waiting (e.g. a cancelled request) cannot cancel the run for the others.
+    """
+
+    def __init__(self, fn: Callable[..., Any], name: str = "job") -> None:
+        self.fn = fn
+        self.name = name
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._current: Job | None = None
+
+    @property
+    def last(self) -> Job | None:
+        """The running job, or the most recent finished one."""
+        return self._current
+
+    def submit(self, *args: Any, **kwargs: Any) -> Job:
+        """Start a run with these arguments, or return the one already in flight.
+
+        Arguments only apply when this call starts the run.
+        """
+        with self._lock:
+            job = self._current
+            if job is not None and not job.future.done():
+                return job
+            job = Job(f"{self.name}-{next(self._ids)}")
+            job.future.set_running_or_notify_cancel()
+            self._current = job
+        thread = threading.Thread(
+            target=self._run, args=(job, args, kwargs), name=job.id, daemon=True
+        )
+        thread.start()
+        return job
+
+    def _run(self, job: Job, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        try:
+            result = self.fn(*args, **kwargs)
+        except BaseException as exc:
+            job.finished_at = time.time()
+            job.future.set_exception(exc)
+        else:
+            job.finished_at = time.time()
+            job.future.set_result(result)
@@ -0,0 +1,292 @@
+"""Precomputed search text and token index for ``search_transactions``.
+
+A query is matched against one normalized string per row (account, IBAN,
+reason, counterparty, posting text and the category fields, lowercased and
+joined). That text only changes when the data is reloaded, so it is built
+once per load instead of for every row on every query. Rows with identical
+text share one entry, so a query scores each distinct text at most once.
+
+Substring and word-containment matches are answered from an inverted
+index instead of a row scan. Each searched field is dictionary-coded with
+its rows grouped by value, and every distinct word (token) points to the
+field values containing it. A lookup therefore touches the distinct values
+of each field, not every row (see ``SearchIndex.matching_rows``).
+
+Rows that only match fuzzily are scored with ``SequenceMatcher``, whose
+ratio can never exceed what the lengths and shared characters of the two
+strings allow. Texts are kept ordered by length so a query only scores
+texts that could reach the minimum score (see ``SearchIndex.fuzzy_scores``).
+
+Kept free of FastMCP imports so it can be tested and reused in isolation.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from difflib import SequenceMatcher
+from itertools import accumulate, chain
+from typing import Any, NamedTuple
+
+from .store import TransactionStore, Vocabulary
+
+# Store columns joined into the search text, in order
+SEARCH_FIELDS = (
+    "accounts",
+    "numbers",
+    "reasons",
+    "names",
+    "posting_texts",
+    "categories",
+    "subcategories",
+    "category_paths",
+)
+
+# Token postings pack (value code, field position) into one integer
+_FIELD_BITS = 3
+
+# Matching rows kept per query needle (see ``SearchIndex.matching_rows``)
+MATCH_CACHE_SIZE = 64
+
+
+def normalize_text(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def similarity(needle: str, haystack: str) -> float:
+    if not needle:
+        return 1.0
+    if not haystack:
+        return 0.0
+    # Exact substring match
+    if needle in haystack:
+        return 1.0
+    # Check if needle is contained in any word (handles plural/singular variations)
+    # e.g., "shop" matches "shopping", "netflix premium" matches "netflix"
+    haystack_words = haystack.split()
+    for word in haystack_words:
+        if needle in word or word in needle:
+            return 1.0
+    # Fall back to fuzzy matching for partial matches
+    return SequenceMatcher(None, needle, haystack).ratio()
+
+
+class _Field(NamedTuple):
+    """One searched column: normalized values, per-row codes and rows grouped by value."""
+
+    values: list[str]
+    codes: Sequence[int]
+    # Row ids sorted by value (row order within a value); value ``v`` owns
+    # ``rows[starts[v]:starts[v + 1]]``
+    rows: array
+    starts: array
+
+    def rows_of(self, code: int) -> array:
+        return self.rows[self.starts[code] : self.starts[code + 1]]
+
+
+def _field(values: list[str], codes: Sequence[int]) -> _Field:
+    rows = array("I", sorted(range(len(codes)), key=codes.__getitem__))
+    counts = Counter(codes)
+    starts = array("I", accumulate(map(counts.__getitem__, range(len(values))), initial=0))
+    return _Field(values, codes, rows, starts)
+
+
+class SearchIndex:
+    """Normalized search text of every row in a store, deduplicated and indexed.
+
+    ``codes[row]`` points into ``texts``. ``tokens`` lists the distinct
+    words of all searched values; each token's postings name the field
+    values it occurs in.
+    """
+
+    __slots__ = (
+        "codes",
+        "texts",
+        "tokens",
+        "_fields",
+        "_token_ids",
+        "_postings",
+        "_posting_starts",
+        "_token_blob",
+        "_token_offsets",
+        "_longest_token",
+        "_by_length",
+        "_lengths",
+        "_matches",
+    )
+
+    def __init__(self, store: TransactionStore) -> None:
+        fields: list[_Field] = []
+        for name in SEARCH_FIELDS:
+            column = getattr(store, name)
+            vocab_name = store.CODED_COLUMNS.get(name)
+            if vocab_name is not None:
+                # Coded fields are normalized once per distinct value
+                values = [normalize_text(value) for value in getattr(store, vocab_name).values]
+                fields.append(_field(values, column))
+            else:
+                vocab = Vocabulary()
+                codes = array("I", map(vocab.encode, map(str.lower, map(str.strip, column))))
+                fields.append(_field(vocab.values, codes))
+        self._fields = fields
+
+        texts = Vocabulary()
+        joined = map(
+            " ".join,
+            zip(
+                *(map(field.values.__getitem__, field.codes) for field in fields),
+                strict=True,
+            ),
+        )
+        self.codes = array("I", map(texts.encode, joined))
+        self.texts = texts.values
+
+        # Token -> field values containing it, as value code << _FIELD_BITS | field.
+        # Collected as parallel (token, key) arrays and grouped by token with
+        # one sort, which is much cheaper than growing a list per token
+        token_ids: dict[str, int] = {}
+        token_of = array("I")
+        key_of = array("Q")
+        for position, field in enumerate(fields):
+            for code, value in enumerate(field.values):
+                key = code << _FIELD_BITS | position
+                for word in set(value.split()):
+                    token_of.append(token_ids.setdefault(word, len(token_ids)))
+                    key_of.append(key)
+        self.tokens = list(token_ids)
+        self._token_ids = token_ids
+        order = sorted(range(len(token_of)), key=token_of.__getitem__)
+        self._postings = array("Q", map(key_of.__getitem__, order))
+        counts = Counter(token_of)
+        self._posting_starts = array(
+            "I", accumulate(map(counts.__getitem__, range(len(self.tokens))), initial=0)
+        )
+
+        # Substring lookups scan one newline-separated string of all tokens
+        self._token_blob = "\n".join(self.tokens)
+        self._token_offsets = array("I", accumulate((len(t) + 1 for t in self.tokens), initial=0))
+        self._longest_token = max(map(len, self.tokens), default=0)
+        # Text codes ordered by text length, and those lengths
+        lengths = array("I", map(len, self.texts))
+        self._by_length = array("I", sorted(range(len(lengths)), key=lengths.__getitem__))
+        self._lengths = array("I", map(lengths.__getitem__, self._by_length))
+        self._matches: dict[str, Sequence[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def text(self, index: int) -> str:
+        return self.texts[self.codes[index]]
+
+    def matching_rows(self, needle: str) -> Sequence[int]:
+        """Return the rows ``needle`` matches exactly or at word level, in row order.
+
+        That is every row whose text contains ``needle`` as a substring, plus
+        every row with a word that contains ``needle`` or is contained in it
+        ("shop" finds "shopping", "netflix premium" finds "netflix"). ``needle`` must be
+        normalized and non-empty.
+
+        Finding the words that contain ``needle`` scans all distinct words
+        once, so results are cached per needle; queries tend to repeat.
+        """
+        rows = self._matches.get(needle)
+        if rows is None:
+            rows = array("I", self._find_rows(needle))
+            if len(self._matches) >= MATCH_CACHE_SIZE:
+                self._matches.pop(next(iter(self._matches)), None)
+            self._matches[needle] = rows
+        return rows
+
+    def fuzzy_scores(self, needle: str, min_score: float) -> dict[int, float]:
+        """Return ``{text code: similarity}`` for texts ``needle`` only matches fuzzily.
+
+        Keeps the texts scoring at least ``min_score`` and below 1.0 (those
+        are found by ``matching_rows``), with exactly the score
+        ``similarity`` gives them. A ``SequenceMatcher`` ratio is at most
+        ``2 * min(len(a), len(b)) / (len(a) + len(b))`` and at most twice the
+        characters both strings share over their total length, so texts of
+        the wrong length are never looked at and texts without enough
+        shared characters are never scored.
+        """
+        size = len(needle)
+        if not size:
+            return {}
+        if min_score > 0:
+            # Lengths where the length bound can reach min_score, widened by
+            # one so rounding never excludes a text the exact check keeps
+            shortest = max(0, math.floor(min_score * size / (2 - min_score)) - 1)
+            longest = math.ceil(2 * size / min_score - size) + 1
+            start = bisect_left(self._lengths, shortest)
+            stop = bisect_right(self._lengths, longest)
+        else:
+            start, stop = 0, len(self._lengths)
+        wanted = Counter(needle).items()
+        texts = self.texts
+        scores: dict[int, float] = {}
+        for code in self._by_length[start:stop]:
+            text = texts[code]
+            total = size + len(text)
+            if 2.0 * min(size, len(text)) / total < min_score:
+                continue
+            shared = sum(min(text.count(char), count) for char, count in wanted)
+            if 2.0 * shared / total < min_score:
+                continue
+            score = similarity(needle, text)
+            if min_score <= score < 1.0:
+                scores[code] = score
+        return scores
+
+    def _find_rows(self, needle: str) -> Sequence[int]:
+        pieces = needle.split()
+        tokens = set(self._tokens_within(needle))
+        if len(pieces) == 1:
+            # A needle without whitespace can only occur inside one word
+            tokens.update(self._tokens_containing(needle))
+            return self._rows_with(tokens)
+        # Spanning several words: a row can only contain the whole needle if
+        # the needle's longest piece occurs in one of the row's words
+        longest = max(pieces, key=len)
+        codes, texts = self.codes, self.texts
+        spanning = [
+            row
+            for row in self._rows_with(set(self._tokens_containing(longest)))
+            if needle in texts[codes[row]]
+        ]
+        if not tokens:
+            return spanning
+        return sorted({*spanning, *self._rows_with(tokens)})
+
+    def _rows_with(self, tokens: Iterable[int]) -> Sequence[int]:
+        """Rows holding any of ``tokens``, in row order."""
+        postings, starts = self._postings, self._posting_starts
+        keys = set(
+            chain.from_iterable(postings[starts[token] : starts[token + 1]] for token in tokens)
+        )
+        mask = (1 << _FIELD_BITS) - 1
+        slices = [self._fields[key & mask].rows_of(key >> _FIELD_BITS) for key in keys]
+        if len(slices) == 1:
+            return slices[0]
+        return sorted(set(chain.from_iterable(slices)))
+
+    def _tokens_containing(self, piece: str) -> Iterator[int]:
+        """Yield tokens that contain ``piece`` (which has no whitespace)."""
+        blob, offsets = self._token_blob, self._token_offsets
+        position = blob.find(piece)
+        while position != -1:
+            token = bisect_right(offsets, position) - 1
+            yield token
+            position = blob.find(piece, offsets[token + 1])
+
+    def _tokens_within(self, needle: str) -> Iterator[int]:
+        """Yield tokens that are substrings of ``needle``."""
+        lookup = self._token_ids.get
+        longest = self._longest_token
+        for start in range(len(needle)):
+            for stop in range(start + 1, min(len(needle), start + longest) + 1):
+                token = lookup(needle[start:stop])
+                if token is not None:
+                    yield token
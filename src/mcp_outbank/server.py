@@ -1,15 +1,18 @@
-import csv
+import asyncio
 import json
 import logging
+import math
 import os
 import sys
+import threading
 import time
+from collections.abc import Iterable, Sequence
 from datetime import date, datetime
-from difflib import SequenceMatcher
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 from fastmcp import FastMCP
 from fastmcp.server.dependencies import get_http_headers
 from fastmcp.server.middleware import Middleware, MiddlewareContext
@@ -21,16 +24,53 @@ from rich.text import Text
 
 from .auth import BearerTokenVerifier
 from .exclusion_filters import (
+    ExclusionMatcher,
     env_exclusion_list_display,
-    should_exclude_transaction,
+    normalize_exclusion_list,
 )
+from .ingest import (
+    DEFAULT_CHUNK_SIZE,
+    EXPECTED_HEADERS,
+    ContentIndex,
+    FileFingerprint,
+    LoadedFile,
+    fingerprint_file,
+    load_file,
+    parse_date,
+    parse_files,
+    same_content,
+    zstd_available,
+)
+from .jobs import SingleFlight
+from .search_index import SearchIndex, normalize_text
+from .snapshot import read_snapshot, snapshot_path, write_snapshot
+from .store import (
+    MISSING_AMOUNT,
+    MISSING_DATE,
+    SORTABLE_COLUMNS,
+    Transaction,
+    TransactionStore,
+    ordinal_to_date,
+)
+from .watcher import FolderWatcher
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Variables already set in the process environment take precedence over .env
+_PROCESS_ENV_KEYS = frozenset(os.environ)
+_DOTENV_PATH = find_dotenv()
 
 # Load environment variables from .env file if it exists
-load_dotenv()
+load_dotenv(_DOTENV_PATH)
 
 # Track server startup time for uptime calculation
 _SERVER_START_TIME = time.time()
 
+_logger = logging.getLogger(__name__)
+
 
 def _env_int(name: str, default: int) -> int:
     value = os.getenv(name)
@@ -97,6 +137,49 @@ def _env_rate_limit() -> float | None:
         return None
 
 
+def _env_ingest_workers() -> int:
+    """Get the number of worker processes used to parse CSV files.
+
+    Default: 1 (parse in-process). 0 or a negative value uses one worker per CPU.
+    """
+    workers = _env_int("OUTBANK_INGEST_WORKERS", 1)
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _env_ingest_chunk_size() -> int:
+    """Get how many normalized rows are buffered before appending to the store.
+
+    Default: 5000. Bounds peak memory while a file streams in-process.
+    """
+    return max(1, _env_int("OUTBANK_INGEST_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+
+
+def _env_snapshot_enabled() -> bool:
+    """Check if the on-disk store snapshot is enabled (OUTBANK_SNAPSHOT_ENABLED, default: true)."""
+    return _env_bool("OUTBANK_SNAPSHOT_ENABLED", True)
+
+
+def _env_snapshot_dir() -> Path:
+    """Get the snapshot cache directory from environment.
+
+    Default: ~/.cache/mcp-outbank
+    """
+    value = os.getenv("OUTBANK_SNAPSHOT_DIR", "~/.cache/mcp-outbank")
+    return Path(value).expanduser()
+
+
+def _env_content_dedup() -> bool:
+    """Check if rows repeated across overlapping exports are collapsed (OUTBANK_CONTENT_DEDUP)."""
+    return _env_bool("OUTBANK_CONTENT_DEDUP", False)
+
+
+def _env_watch_enabled() -> bool:
+    """Check if the background CSV folder watcher is enabled (OUTBANK_WATCH_ENABLED, default: false)."""
+    return _env_bool("OUTBANK_WATCH_ENABLED", False)
+
+
 def _env_request_timeout() -> int | None:
     """Get request timeout in seconds from environment.
 
@@ -202,98 +285,30 @@ def _audit_log(tool_name: str, parameters: dict[str, Any], client_ip: str | None
     logger.info(json.dumps(entry, default=str))
 
 
-def _parse_amount(value: Any) -> float | None:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip().replace(" ", "")
-        if cleaned == "":
-            return None
-        cleaned = cleaned.replace(".", "").replace(",", ".")
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-    return None
-
-
-def _parse_date(value: Any) -> date | None:
-    if value is None:
-        return None
-    if isinstance(value, date) and not isinstance(value, datetime):
-        return value
-    if isinstance(value, datetime):
-        return value.date()
-    if isinstance(value, str):
-        value = value.strip()
-        if value == "":
-            return None
-        for fmt in (
-            "%Y-%m-%d",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S.%f",
-            "%d.%m.%Y",
-        ):
-            try:
-                return datetime.strptime(value, fmt).date()
-            except ValueError:
-                continue
-        try:
-            return datetime.fromisoformat(value).date()
-        except ValueError:
-            return None
-    return None
+class _Generation(NamedTuple):
+    """Everything tools read about the loaded data, published as one unit.
 
+    A reload builds a complete new generation and publishes it by
+    reassigning ``_GENERATION``, a single reference swap. Tools read
+    ``_GENERATION`` once per request and use only that object, so they never
+    see a mix of old and new state and never wait for a reload. The store is
+    not modified after it is published.
+    """
+
+    number: int
+    store: TransactionStore
+    # Normalized search text of ``store``, built once per load
+    search: SearchIndex
+    # Per-file fingerprints and row ranges of what is in ``store``
+    registry: dict[str, LoadedFile]
+    config: tuple[bool]
+    metadata: dict[str, Any]
 
-def _normalize_text(value: Any) -> str:
-    if value is None:
-        return ""
-    return str(value).strip().lower()
-
-
-def _similarity(needle: str, haystack: str) -> float:
-    if not needle:
-        return 1.0
-    if not haystack:
-        return 0.0
-    # Exact substring match
-    if needle in haystack:
-        return 1.0
-    # Check if needle is contained in any word (handles plural/singular variations)
-    # e.g., "grocery" matches "groceries", "shop" matches "shopping"
-    haystack_words = haystack.split()
-    for word in haystack_words:
-        if needle in word or word in needle:
-            return 1.0
-    # Fall back to fuzzy matching for partial matches
-    return SequenceMatcher(None, needle, haystack).ratio()
-
-
-EXPECTED_HEADERS = [
-    "#",
-    "Account",
-    "Date",
-    "Value Date",
-    "Amount",
-    "Currency",
-    "Name",
-    "Number",
-    "Bank",
-    "Reason",
-    "Category",
-    "Subcategory",
-    "Category-Path",
-    "Tags",
-    "Note",
-    "Posting Text",
-]
-
-_TRANSACTIONS: list[dict[str, Any]] = []
-_TRANSACTION_KEYS: set[str] = set()
-_DATA_LOADED = False
-_STORE_METADATA: dict[str, Any] = {"files_scanned": 0}
+
+_GENERATION: _Generation | None = None
+# Serializes reloads (tool calls, background watcher); readers never take it
+_RELOAD_LOCK = threading.RLock()
+_WATCHER: FolderWatcher | None = None
 
 
 def _csv_directory() -> Path:
@@ -304,215 +319,671 @@ def _csv_glob() -> str:
     return os.getenv("OUTBANK_CSV_GLOB", "*.csv")
 
 
-def _validate_headers(fieldnames: list[str] | None, source_file: str) -> None:
-    if not fieldnames:
-        raise ValueError(f"{source_file} has no headers")
-    missing = [header for header in EXPECTED_HEADERS if header not in fieldnames]
-    if missing:
-        missing_list = ", ".join(missing)
-        raise ValueError(f"{source_file} is missing headers: {missing_list}")
+def _csv_patterns() -> list[str]:
+    """Glob patterns for export files, including compressed variants if enabled.
+
+    With OUTBANK_INCLUDE_COMPRESSED, ``<glob>.gz``, ``<glob>.zst`` (when
+    zstandard is installed) and, for a glob ending in ``.csv``, the matching
+    ``.zip`` archives are loaded as well.
+    """
+    pattern = _csv_glob()
+    if not _env_bool("OUTBANK_INCLUDE_COMPRESSED", False):
+        return [pattern]
+    patterns = [pattern, f"{pattern}.gz"]
+    if zstd_available():
+        patterns.append(f"{pattern}.zst")
+    if pattern.endswith(".csv"):
+        patterns.append(f"{pattern[: -len('.csv')]}.zip")
+    return patterns
 
 
 def _list_csv_files() -> list[Path]:
     csv_dir = _csv_directory()
     if not csv_dir.exists():
         raise ValueError(f"CSV folder not found: {csv_dir}")
-    files = sorted(csv_dir.glob(_csv_glob()))
+    files = sorted({path for pattern in _csv_patterns() for path in csv_dir.glob(pattern)})
     if not files:
         raise ValueError(f"No CSV files found in {csv_dir}")
     return files
 
 
-def _format_date(value: date | None) -> str | None:
-    if value is None:
+def _load_config() -> tuple[bool]:
+    """Settings that decide which rows a load keeps (content dedup).
+
+    Exclusions are not part of it: excluded rows are kept in the store and
+    only hidden by its exclusion mask.
+    """
+    return (_env_content_dedup(),)
+
+
+_EXCLUSION_VARS = ("EXCLUDED_CATEGORIES", "EXCLUDED_TAGS")
+# Per-query exclusions each cost one cached mask (see TransactionStore.pattern_mask)
+_MAX_QUERY_EXCLUSIONS = 20
+
+
+def _refresh_exclusion_env() -> None:
+    """Re-read EXCLUDED_CATEGORIES/EXCLUDED_TAGS from the .env file.
+
+    Lets edited exclusions apply without a restart. Variables that were set
+    in the process environment at startup keep precedence, as they do for
+    ``load_dotenv``.
+    """
+    if not _DOTENV_PATH:
+        return
+    try:
+        values = dotenv_values(_DOTENV_PATH)
+    except OSError as exc:
+        _logger.warning("Could not re-read %s: %s", _DOTENV_PATH, exc)
+        return
+    for name in _EXCLUSION_VARS:
+        if name in _PROCESS_ENV_KEYS:
+            continue
+        value = values.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _exclusion_matcher() -> ExclusionMatcher:
+    """Compile the currently configured exclusions (environment and .env file)."""
+    _refresh_exclusion_env()
+    return ExclusionMatcher.from_env()
+
+
+def _snapshot_file() -> Path | None:
+    if not _env_snapshot_enabled():
         return None
-    return value.isoformat()
+    return snapshot_path(_env_snapshot_dir(), _csv_directory(), _csv_glob())
 
 
-def _split_tags(value: Any) -> list[str]:
-    if value is None:
-        return []
-    if isinstance(value, list):
-        return [str(item).strip() for item in value if str(item).strip()]
-    text = str(value).strip()
-    if not text:
-        return []
-    return [item.strip() for item in text.split(",") if item.strip()]
-
-
-def _normalize_transaction(row: dict[str, Any], source_file: str, row_index: int) -> dict[str, Any]:
-    row_id = str(row.get("#") or "").strip()
-    if not row_id:
-        row_id = str(row_index)
-
-    booking_date = _format_date(_parse_date(row.get("Date")))
-    value_date = _format_date(_parse_date(row.get("Value Date")))
-    amount = _parse_amount(row.get("Amount"))
-    tags = _split_tags(row.get("Tags"))
-    record_key = f"{source_file}:{row_id}"
+def _read_snapshot(
+    config: tuple[bool],
+) -> tuple[TransactionStore, dict[str, LoadedFile]] | None:
+    path = _snapshot_file()
+    if path is None:
+        return None
+    return read_snapshot(path, config)
 
-    return {
-        "id": row_id,
-        "account": str(row.get("Account") or "").strip(),
-        "booking_date": booking_date,
-        "value_date": value_date,
-        "amount": amount,
-        "currency": str(row.get("Currency") or "").strip(),
-        "name": str(row.get("Name") or "").strip(),
-        "number": str(row.get("Number") or "").strip(),
-        "bank": str(row.get("Bank") or "").strip(),
-        "reason": str(row.get("Reason") or "").strip(),
-        "category": str(row.get("Category") or "").strip(),
-        "subcategory": str(row.get("Subcategory") or "").strip(),
-        "category_path": str(row.get("Category-Path") or "").strip(),
-        "tags": tags,
-        "note": str(row.get("Note") or "").strip(),
-        "posting_text": str(row.get("Posting Text") or "").strip(),
-        "source_file": source_file,
-        "record_key": record_key,
-    }
 
+def _write_snapshot(
+    store: TransactionStore,
+    registry: dict[str, LoadedFile],
+    config: tuple[bool],
+) -> None:
+    """Persist the store for the next process start; failures only cost startup time."""
+    path = _snapshot_file()
+    if path is None:
+        return
+    try:
+        write_snapshot(path, store, registry, config)
+    except OSError as exc:
+        _logger.warning("Could not write transaction snapshot to %s: %s", path, exc)
+
+
+def _load_transactions(
+    previous: TransactionStore | None = None,
+    registry: dict[str, LoadedFile] | None = None,
+    profile: bool = False,
+) -> tuple[TransactionStore, dict[str, LoadedFile], dict[str, Any]]:
+    """Load transactions from CSV files, reusing unchanged files from a previous load.
+
+    Files whose fingerprint matches ``registry`` are copied over from
+    ``previous`` without being re-read; only new or modified files are parsed,
+    on ``OUTBANK_INGEST_WORKERS`` worker processes. In-process parsing streams
+    each file into the store in chunks instead of materializing it first.
+    Deleted files simply drop out.
+
+    With ``OUTBANK_CONTENT_DEDUP`` rows whose content already appears in an
+    earlier file (sorted order) are collapsed. A file's surviving rows then
+    depend on every file before it, so reuse stops at the first file that
+    changed, appeared or disappeared.
+
+    With ``profile`` the statistics also carry a ``profile`` entry with the
+    fingerprinting time and a per-stage timing breakdown for each parsed file.
 
-def _load_transactions() -> tuple[list[dict[str, Any]], set[str], int, int, int]:
-    """Load transactions from CSV files.
+    The statistics name the ``parsed_files`` (registry keys); the others were
+    copied from ``previous`` unchanged. The returned store has no exclusion
+    mask yet.
 
     Returns:
-        Tuple of (transactions list, transaction keys set, file count, excluded count, total parsed count)
+        Tuple of (transaction store, file registry, load statistics)
     """
-    transactions: list[dict[str, Any]] = []
-    keys: set[str] = set()
-    excluded_count = 0
-    total_parsed = 0
     files = _list_csv_files()
-
-    for file_path in files:
-        with file_path.open("r", encoding="utf-8-sig", newline="") as handle:
-            reader = csv.DictReader(handle, delimiter=";")
-            _validate_headers(
-                list(reader.fieldnames) if reader.fieldnames is not None else None, file_path.name
+    registry = registry or {}
+    store = previous.derive() if previous is not None else TransactionStore()
+    new_registry: dict[str, LoadedFile] = {}
+    parsed_keys: set[str] = set()
+    duplicate_count = 0
+    total_parsed = 0
+    content_index = ContentIndex() if _env_content_dedup() else None
+    file_profiles: list[dict[str, Any]] = []
+    fingerprint_started = time.perf_counter()
+
+    # Decide per file whether its rows can be reused, then parse the rest
+    # (possibly in parallel) and merge everything back in sorted-file order
+    fingerprints: list[FileFingerprint] = []
+    reusable: list[bool] = []
+    previous_order = list(registry)
+    for position, file_path in enumerate(files):
+        loaded = registry.get(str(file_path))
+        fingerprint = fingerprint_file(file_path, loaded.fingerprint if loaded else None)
+        fingerprints.append(fingerprint)
+        reuse = (
+            previous is not None
+            and loaded is not None
+            and same_content(fingerprint, loaded.fingerprint)
+        )
+        if content_index is not None:
+            reuse = (
+                reuse
+                and all(reusable)
+                and position < len(previous_order)
+                and previous_order[position] == str(file_path)
             )
-            for row_index, row in enumerate(reader, start=1):
-                if not row or not any(value for value in row.values()):
-                    continue
-                transaction = _normalize_transaction(row, file_path.name, row_index)
-                total_parsed += 1
-
-                # Apply exclusion filters
-                if should_exclude_transaction(transaction):
-                    excluded_count += 1
-                    continue
-
-                key = transaction["record_key"]
-                if key in keys:
-                    continue
-                keys.add(key)
-                transactions.append(transaction)
-
-    return transactions, keys, len(files), excluded_count, total_parsed
-
-
-def _ensure_loaded() -> None:
-    if not _DATA_LOADED:
-        _reload_transactions()
-
-
-def _reload_transactions() -> dict[str, Any]:
-    global _DATA_LOADED, _STORE_METADATA, _TRANSACTION_KEYS, _TRANSACTIONS
-    old_keys = set(_TRANSACTION_KEYS)
-    transactions, keys, file_count, excluded_count, total_parsed = _load_transactions()
-
-    _TRANSACTIONS = transactions
-    _TRANSACTION_KEYS = keys
-    _DATA_LOADED = True
-    _STORE_METADATA = {
-        "files_scanned": file_count,
-        "excluded_count": excluded_count,
+        reusable.append(reuse)
+    fingerprint_seconds = time.perf_counter() - fingerprint_started
+
+    to_parse = [file_path for file_path, reuse in zip(files, reusable, strict=True) if not reuse]
+    workers = _env_ingest_workers()
+    chunk_size = _env_ingest_chunk_size()
+    parsed_files = parse_files(to_parse, workers, profile) if workers > 1 else None
+    for file_path, fingerprint, reuse in zip(files, fingerprints, reusable, strict=True):
+        entry_key = str(file_path)
+        loaded = registry.get(entry_key)
+        start = len(store)
+
+        if not reuse:
+            timings: dict[str, float] | None = {} if profile else None
+            if parsed_files is None:
+                parsed = load_file(file_path, store, chunk_size, timings)
+            else:
+                parsed_file = next(parsed_files)
+                merge_started = time.perf_counter()
+                store.extend(parsed_file.store)
+                parsed = parsed_file.total_parsed
+                if timings is not None and parsed_file.timings is not None:
+                    timings.update(parsed_file.timings)
+                    timings["store"] = (
+                        timings.get("store", 0.0) + time.perf_counter() - merge_started
+                    )
+            collapse_started = time.perf_counter()
+            duplicates = content_index.collapse(store, start) if content_index is not None else 0
+            if timings is not None:
+                if content_index is not None:
+                    timings["content_dedup"] = time.perf_counter() - collapse_started
+                file_profiles.append(_file_profile(file_path, parsed, timings))
+            parsed_keys.add(entry_key)
+        else:
+            store.extend_from(previous, loaded.start, loaded.stop)
+            if content_index is not None:
+                content_index.add_collapsed(store, start, len(store))
+            parsed = loaded.total_parsed
+            duplicates = loaded.duplicate_count
+
+        store.add_partition(start, len(store))
+        new_registry[entry_key] = LoadedFile(fingerprint, start, len(store), parsed, duplicates)
+        total_parsed += parsed
+        duplicate_count += duplicates
+
+    stats: dict[str, Any] = {
+        "files_scanned": len(files),
+        "parsed_files": parsed_keys,
+        "duplicates_collapsed": duplicate_count,
         "total_parsed": total_parsed,
     }
+    if profile:
+        stats["profile"] = {
+            "fingerprint_seconds": round(fingerprint_seconds, 4),
+            "files": file_profiles,
+        }
+    return store, new_registry, stats
+
 
+def _file_profile(file_path: Path, rows: int, timings: dict[str, float]) -> dict[str, Any]:
+    """Summarize one parsed file's stage timings (seconds) for the reload profile."""
+    seconds = sum(timings.values())
     return {
-        "files_scanned": file_count,
-        "total_records": len(keys),
-        "new_records": len(keys - old_keys),
-        "removed_records": len(old_keys - keys),
-        "excluded_count": excluded_count,
-        "total_parsed": total_parsed,
+        "file": file_path.name,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+        "stages": {stage: round(value, 4) for stage, value in timings.items()},
+    }
+
+
+def _peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far, where the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _reload_profile(
+    load_profile: dict[str, Any], seconds: float, peak_before: int | None
+) -> dict[str, Any]:
+    """Aggregate per-file timings into the profile returned by a reload."""
+    stages: dict[str, float] = {}
+    for file_profile in load_profile["files"]:
+        for stage, value in file_profile["stages"].items():
+            stages[stage] = stages.get(stage, 0.0) + value
+    rows = sum(file_profile["rows"] for file_profile in load_profile["files"])
+    parse_seconds = sum(stages.values())
+    peak_after = _peak_rss_bytes()
+    return {
+        "total_seconds": round(seconds, 4),
+        "fingerprint_seconds": load_profile["fingerprint_seconds"],
+        "files_parsed": len(load_profile["files"]),
+        "rows_parsed": rows,
+        "rows_per_sec": round(rows / parse_seconds) if parse_seconds else None,
+        "stages": {stage: round(value, 4) for stage, value in stages.items()},
+        # Growth of the process's peak RSS; 0 when the reload stayed below an earlier peak
+        "peak_memory_delta_bytes": (
+            peak_after - peak_before if peak_after is not None and peak_before is not None else None
+        ),
+        "files": load_profile["files"],
     }
 
 
+def _current_generation() -> _Generation:
+    """Return the published generation, loading the data on first use."""
+    generation = _GENERATION
+    if generation is None:
+        with _RELOAD_LOCK:
+            if _GENERATION is None:
+                _reload_transactions()
+            generation = _GENERATION
+    return generation
+
+
+def _publish(
+    store: TransactionStore,
+    search: SearchIndex,
+    registry: dict[str, LoadedFile],
+    config: tuple[bool],
+    metadata: dict[str, Any],
+) -> _Generation:
+    """Swap in a new generation; callers hold ``_RELOAD_LOCK``."""
+    global _GENERATION
+    number = _GENERATION.number + 1 if _GENERATION is not None else 1
+    _GENERATION = _Generation(number, store, search, registry, config, metadata)
+    return _GENERATION
+
+
+def _reload_transactions(profile: bool | None = None) -> dict[str, Any]:
+    """Reload CSV files and publish them as a new generation.
+
+    Serialized with a lock so tool calls and the background watcher never
+    rebuild concurrently. The new store is only published once fully built;
+    if the reload fails, the previous generation keeps serving.
+    ``profile`` (default: OUTBANK_PROFILE_RELOADS) adds and logs a timing
+    breakdown of the load.
+    """
+    if profile is None:
+        profile = _env_bool("OUTBANK_PROFILE_RELOADS", False)
+    with _RELOAD_LOCK:
+        started = time.perf_counter()
+        peak_before = _peak_rss_bytes() if profile else None
+        current = _GENERATION
+        # Content dedup is applied at load time, so cached rows are only
+        # reusable while it stays the same; exclusions only change the mask
+        config = _load_config()
+        previous: TransactionStore | None = None
+        previous_registry: dict[str, LoadedFile] | None = None
+        if current is not None and config == current.config:
+            previous, previous_registry = current.store, current.registry
+        elif current is None:
+            # Cold start: seed from the on-disk snapshot so only files that
+            # changed since it was written get parsed
+            snapshot = _read_snapshot(config)
+            if snapshot is not None:
+                previous, previous_registry = snapshot
+
+        transactions, registry, stats = _load_transactions(previous, previous_registry, profile)
+        mask_started = time.perf_counter()
+        matcher = _exclusion_matcher()
+        excluded_count = transactions.apply_exclusions(matcher)
+        mask_seconds = time.perf_counter() - mask_started
+        search_started = time.perf_counter()
+        search = SearchIndex(transactions)
+        search_seconds = time.perf_counter() - search_started
+        filter_started = time.perf_counter()
+        for name in SORTABLE_COLUMNS:
+            transactions.sorted_index(name)
+        filter_seconds = time.perf_counter() - filter_started
+        if current is None:
+            # Report a cold load the same way regardless of snapshot reuse
+            stats["new_records"] = transactions.visible_count()
+            stats["removed_records"] = 0
+        elif previous is None:
+            # Full reparse; diff against the old keys the way a cold load would
+            old_keys = current.store.record_keys(0, len(current.store), visible_only=True)
+            keys = transactions.record_keys(0, len(transactions), visible_only=True)
+            stats["new_records"] = len(keys - old_keys)
+            stats["removed_records"] = len(old_keys - keys)
+        else:
+            stats["new_records"], stats["removed_records"] = _record_changes(
+                current.store, current.registry, transactions, registry, stats["parsed_files"]
+            )
+
+        snapshot_started = time.perf_counter()
+        if registry != previous_registry:
+            _write_snapshot(transactions, registry, config)
+        snapshot_seconds = time.perf_counter() - snapshot_started
+
+        seconds = time.perf_counter() - started
+        metadata = {
+            "files_scanned": stats["files_scanned"],
+            "excluded_count": excluded_count,
+            "duplicates_collapsed": stats["duplicates_collapsed"],
+            "total_parsed": stats["total_parsed"],
+            "last_reload_seconds": round(seconds, 4),
+        }
+        generation = _publish(transactions, search, registry, config, metadata)
+
+        result = {
+            "generation": generation.number,
+            "files_scanned": stats["files_scanned"],
+            "total_records": transactions.visible_count(),
+            "new_records": stats["new_records"],
+            "removed_records": stats["removed_records"],
+            "excluded_count": excluded_count,
+            "duplicates_collapsed": stats["duplicates_collapsed"],
+            "total_parsed": stats["total_parsed"],
+        }
+        if profile:
+            result["profile"] = _reload_profile(stats["profile"], seconds, peak_before)
+            result["profile"]["snapshot_seconds"] = round(snapshot_seconds, 4)
+            result["profile"]["exclusion_mask_seconds"] = round(mask_seconds, 4)
+            result["profile"]["search_index_seconds"] = round(search_seconds, 4)
+            result["profile"]["filter_index_seconds"] = round(filter_seconds, 4)
+            _log_reload_profile(result["profile"])
+        return result
+
+
+def _record_changes(
+    previous: TransactionStore,
+    previous_registry: dict[str, LoadedFile],
+    store: TransactionStore,
+    registry: dict[str, LoadedFile],
+    parsed_files: set[str],
+) -> tuple[int, int]:
+    """Count the visible records an incremental reload added and removed.
+
+    Record keys are diffed file by file, over rows not hidden by each
+    store's exclusion mask. A file copied over unchanged is skipped unless
+    its rows are hidden differently now (the exclusion filters changed).
+
+    Returns:
+        Tuple of (new records, removed records)
+    """
+    new_records = 0
+    removed_records = 0
+    for entry_key, loaded in registry.items():
+        old = previous_registry.get(entry_key)
+        if old is None:
+            new_records += len(store.record_keys(loaded.start, loaded.stop, visible_only=True))
+            continue
+        if (
+            entry_key not in parsed_files
+            and previous.excluded[old.start : old.stop]
+            == store.excluded[loaded.start : loaded.stop]
+        ):
+            continue
+        new_keys = store.record_keys(loaded.start, loaded.stop, visible_only=True)
+        old_keys = previous.record_keys(old.start, old.stop, visible_only=True)
+        new_records += len(new_keys - old_keys)
+        removed_records += len(old_keys - new_keys)
+    for entry_key, old in previous_registry.items():
+        if entry_key not in registry:
+            removed_records += len(previous.record_keys(old.start, old.stop, visible_only=True))
+    return new_records, removed_records
+
+
+# Reloads requested through the tool run here: off the event loop, one at a
+# time, with concurrent requests sharing the reload in flight. The watcher
+# calls _reload_transactions directly so changes it saw are never folded
+# into a reload that started before them.
+_RELOADS = SingleFlight(_reload_transactions, name="reload")
+
+
+def _reload_exclusions() -> dict[str, Any]:
+    """Publish a generation with the exclusion mask rebuilt from the current settings.
+
+    Only the mask is recomputed (per distinct category and tag set), so this
+    takes milliseconds and never touches the CSV files. The rows are shared
+    with the previous generation.
+    """
+    with _RELOAD_LOCK:
+        current = _current_generation()
+        started = time.perf_counter()
+        store = current.store.with_exclusions(_exclusion_matcher())
+        seconds = time.perf_counter() - started
+        generation = _publish(
+            store,
+            current.search,
+            current.registry,
+            current.config,
+            {**current.metadata, "excluded_count": store.excluded_count},
+        )
+        return {
+            "generation": generation.number,
+            "excluded_categories": env_exclusion_list_display("EXCLUDED_CATEGORIES"),
+            "excluded_tags": env_exclusion_list_display("EXCLUDED_TAGS"),
+            "total_records": store.visible_count(),
+            "excluded_count": store.excluded_count,
+            "seconds": round(seconds, 4),
+        }
+
+
+def _log_reload_profile(profile: dict[str, Any]) -> None:
+    stages = ", ".join(f"{stage} {value:.3f}s" for stage, value in profile["stages"].items())
+    _logger.info(
+        "Reload took %.3fs (fingerprint %.3fs, exclusion mask %.3fs, search index %.3fs, "
+        "filter indexes %.3fs, snapshot %.3fs); "
+        "parsed %d rows from %d files at %s rows/s [%s]; peak memory +%s bytes",
+        profile["total_seconds"],
+        profile["fingerprint_seconds"],
+        profile["exclusion_mask_seconds"],
+        profile["search_index_seconds"],
+        profile["filter_index_seconds"],
+        profile["snapshot_seconds"],
+        profile["rows_parsed"],
+        profile["files_parsed"],
+        profile["rows_per_sec"],
+        stages or "no files parsed",
+        profile["peak_memory_delta_bytes"],
+    )
+    for file_profile in profile["files"]:
+        _logger.debug("Reload profile for %s: %s", file_profile["file"], file_profile)
+
+
 def _row_matches_filters(
-    row: dict[str, Any],
-    account: str | None,
-    iban: str | None,
-    amount: float | None,
-    amount_min: float | None,
-    amount_max: float | None,
-    date_exact: date | None,
-    date_start: date | None,
-    date_end: date | None,
+    store: TransactionStore,
+    index: int,
+    account_codes: set[int] | None,
+    number_codes: set[int] | None,
+    cents_min: int | None,
+    cents_max: int | None,
+    date_exact: int | None,
+    date_start: int | None,
+    date_end: int | None,
 ) -> bool:
-    row_account = _normalize_text(row.get("account"))
-    row_iban = _normalize_text(row.get("number")).replace(" ", "")
-    row_amount = _parse_amount(row.get("amount"))
-    row_date = _parse_date(row.get("booking_date"))
+    """Check one stored row against pre-normalized filters.
 
-    if account and account not in row_account:
-        return False
-    if iban and iban.replace(" ", "") not in row_iban:
-        return False
-    if amount is not None and (row_amount is None or abs(row_amount - amount) > 0.0001):
-        return False
-    if amount_min is not None and (row_amount is None or row_amount < amount_min):
-        return False
-    if amount_max is not None and (row_amount is None or row_amount > amount_max):
-        return False
-    if date_exact is not None and row_date != date_exact:
-        return False
-    if date_start is not None and (row_date is None or row_date < date_start):
+    ``account_codes``/``number_codes`` hold the vocabulary codes matching the
+    account and IBAN filters, amounts are inclusive bounds in cents (see ``_amount_bounds``) and
+    dates are ordinals, so no per-row parsing is needed.
+    """
+    if account_codes is not None and store.accounts[index] not in account_codes:
         return False
-    if date_end is not None and (row_date is None or row_date > date_end):
+    if number_codes is not None and store.numbers[index] not in number_codes:
         return False
+    if cents_min is not None or cents_max is not None:
+        cents = store.amounts[index]
+        if cents == MISSING_AMOUNT:
+            return False
+        if cents_min is not None and cents < cents_min:
+            return False
+        if cents_max is not None and cents > cents_max:
+            return False
+    if date_exact is not None or date_start is not None or date_end is not None:
+        row_date = store.booking_dates[index]
+        if date_exact is not None and row_date != date_exact:
+            return False
+        if row_date == MISSING_DATE:
+            return False
+        if date_start is not None and row_date < date_start:
+            return False
+        if date_end is not None and row_date > date_end:
+            return False
     return True
 
 
-def _normalize_row(row: dict[str, Any]) -> dict[str, Any]:
-    description = row.get("reason") or row.get("posting_text") or ""
+def _scan_ranges(
+    store: TransactionStore,
+    row_ranges: list[range],
+    date_start: int | None,
+    date_end: int | None,
+    cents_min: int | None,
+    cents_max: int | None,
+) -> list[Sequence[int]]:
+    """Return the rows a date- or amount-bounded scan has to visit, as chunks in row order.
+
+    ``row_ranges`` are the files left after partition pruning. The date- and
+    amount-sorted indexes give the rows inside each set of bounds (an exact
+    date or amount is a dictionary lookup); whichever candidate set is
+    smallest is scanned, so other filters only run on those rows. Either way
+    the result is in row order, which tie-breaking relies on.
+    """
+    best: Sequence[int] | None = None
+    size = sum(map(len, row_ranges))
+    for name, low, high in (
+        ("booking_dates", date_start, date_end),
+        ("amounts", cents_min, cents_max),
+    ):
+        if low is None and high is None:
+            continue
+        index = store.sorted_index(name)
+        rows = index.equal(low) if low is not None and low == high else index.between(low, high)
+        if len(rows) < size:
+            best, size = rows, len(rows)
+    if best is None:
+        return row_ranges
+    return [sorted(best)]
+
+
+def _amount_bounds(
+    amount: float | None, amount_min: float | None, amount_max: float | None
+) -> tuple[int | None, int | None]:
+    """Convert amount filters (euros) to inclusive bounds in integer cents.
+
+    An exact amount that is not a whole number of cents (beyond float noise)
+    cannot match any row and yields an empty range.
+    """
+    if amount is not None:
+        scaled = amount * 100
+        cents = round(scaled)
+        if abs(scaled - cents) > 0.01:
+            return 1, 0
+        return cents, cents
+    cents_min = math.ceil(round(amount_min * 100, 6)) if amount_min is not None else None
+    cents_max = math.floor(round(amount_max * 100, 6)) if amount_max is not None else None
+    return cents_min, cents_max
+
+
+def _account_codes(store: TransactionStore, account_norm: str) -> set[int] | None:
+    """Resolve an account filter to the matching account vocabulary codes."""
+    if not account_norm:
+        return None
+    return store.account_vocab.codes_containing(account_norm)
+
+
+def _number_codes(store: TransactionStore, iban_norm: str) -> set[int] | None:
+    """Resolve an IBAN filter (spaces ignored) to the matching number codes."""
+    if not iban_norm:
+        return None
+    needle = iban_norm.replace(" ", "")
     return {
-        "id": row.get("id"),
-        "date": row.get("booking_date"),
-        "value_date": row.get("value_date"),
-        "amount": row.get("amount"),
-        "currency": row.get("currency"),
-        "account": row.get("account"),
-        "iban": row.get("number"),
-        "counterparty": row.get("name"),
-        "description": description,
-        "category": row.get("category"),
-        "subcategory": row.get("subcategory"),
-        "category_path": row.get("category_path"),
-        "tags": row.get("tags"),
-        "note": row.get("note"),
-        "posting_text": row.get("posting_text"),
-        "source_file": row.get("source_file"),
+        code
+        for code, number in enumerate(store.number_vocab.values)
+        if needle in normalize_text(number).replace(" ", "")
     }
 
 
-def _apply_sort(rows: list[dict[str, Any]], sort: str) -> list[dict[str, Any]]:
+def _query_mask(
+    store: TransactionStore,
+    exclude_categories: list[str] | None,
+    exclude_tags: list[str] | None,
+    include_excluded: bool,
+) -> bytes | bytearray:
+    """Resolve per-query exclusion arguments to the mask of rows to hide.
+
+    Per-pattern masks are cached on the store, so repeating an exclusion
+    (or dropping it again) does not rescan the rows.
+    """
+    categories = normalize_exclusion_list(exclude_categories)
+    tags = normalize_exclusion_list(exclude_tags)
+    if len(categories) + len(tags) > _MAX_QUERY_EXCLUSIONS:
+        raise ValueError(
+            f"exclude_categories and exclude_tags take at most {_MAX_QUERY_EXCLUSIONS} values"
+        )
+    return store.query_mask(categories, tags, include_excluded)
+
+
+def _ordinal(value: date | None) -> int | None:
+    return value.toordinal() if value is not None else None
+
+
+def _normalize_row(record: Transaction) -> dict[str, Any]:
+    """Convert an internal record to the public response shape."""
+    booking_date = ordinal_to_date(record.booking_date)
+    value_date = ordinal_to_date(record.value_date)
+    return {
+        "id": record.id,
+        "date": booking_date.isoformat() if booking_date else None,
+        "value_date": value_date.isoformat() if value_date else None,
+        "amount": record.amount / 100 if record.amount is not None else None,
+        "currency": record.currency,
+        "account": record.account,
+        "iban": record.number,
+        "counterparty": record.name,
+        "description": record.reason or record.posting_text or "",
+        "category": record.category,
+        "subcategory": record.subcategory,
+        "category_path": record.category_path,
+        "tags": list(record.tags),
+        "note": record.note,
+        "posting_text": record.posting_text,
+        "source_file": record.source_file,
+    }
+
+
+def _apply_sort(
+    store: TransactionStore, matches: list[tuple[int, float]], sort: str
+) -> list[tuple[int, float]]:
+    """Sort ``(row index, score)`` matches by a stored column."""
     direction = -1 if sort.startswith("-") else 1
     key = sort.lstrip("-")
     if key not in {"date", "amount"}:
-        return rows
+        return matches
 
-    def sort_key(item: dict[str, Any]) -> tuple[int, Any]:
-        value = item.get(key)
-        if key == "date":
-            parsed = _parse_date(value)
-            return (0, parsed or date.min)
-        if key == "amount":
-            return (0, item.get("amount") or 0.0)
-        return (0, value)
+    if key == "date":
+        column = store.booking_dates
 
-    return sorted(rows, key=sort_key, reverse=direction < 0)
+        def sort_key(item: tuple[int, float]) -> int:
+            return column[item[0]]
+
+    else:
+        column = store.amounts
+
+        def sort_key(item: tuple[int, float]) -> int:
+            cents = column[item[0]]
+            return 0 if cents == MISSING_AMOUNT else cents
+
+    return sorted(matches, key=sort_key, reverse=direction < 0)
 
 
 class RequestSizeLimitMiddleware(Middleware):
@@ -612,6 +1083,9 @@ def search_transactions(
     date_end: str | None = None,
     max_results: int = 25,
     sort: str = "-date",
+    exclude_categories: list[str] | None = None,
+    exclude_tags: list[str] | None = None,
+    include_excluded: bool = False,
 ) -> dict[str, Any]:
     """[finance] Search transactions with fuzzy matching and optional filters.
 
@@ -622,20 +1096,25 @@ def search_transactions(
     - date, date_start, date_end: ISO dates (YYYY-MM-DD)
     - max_results: limit for returned results (default 25, max 500)
     - sort: -date, date, -amount, amount
+    - exclude_categories, exclude_tags: extra exclusions for this query only
+      (matched like EXCLUDED_CATEGORIES/EXCLUDED_TAGS)
+    - include_excluded: also return rows hidden by the configured exclusions
     """
-    _ensure_loaded()
+    # Pin the generation this request started with; reloads publish a new one
+    generation = _current_generation()
+    store = generation.store
 
     # Guard against CPU amplification via long queries (SequenceMatcher is O(N*M))
     if query and len(query) > 500:
         raise ValueError("query must be 500 characters or fewer")
 
-    account_norm = _normalize_text(account)
-    iban_norm = _normalize_text(iban)
-    query_norm = _normalize_text(query)
+    account_norm = normalize_text(account)
+    iban_norm = normalize_text(iban)
+    query_norm = normalize_text(query)
 
-    date_exact = _parse_date(date)
-    range_start = _parse_date(date_start)
-    range_end = _parse_date(date_end)
+    date_exact = parse_date(date)
+    range_start = parse_date(date_start)
+    range_end = parse_date(date_end)
     if date and date_exact is None:
         raise ValueError("date must be ISO format like YYYY-MM-DD")
     if date_start and range_start is None:
@@ -659,46 +1138,77 @@ def search_transactions(
     if amount_min is not None and amount_max is not None and amount_min > amount_max:
         raise ValueError("amount_min must be less than or equal to amount_max")
 
-    results: list[dict[str, Any]] = []
+    hidden = _query_mask(store, exclude_categories, exclude_tags, include_excluded)
+    search = generation.search
     min_score = _env_float("MCP_MIN_SCORE", 0.55)
+    account_codes = _account_codes(store, account_norm)
+    number_codes = _number_codes(store, iban_norm)
+    cents_min, cents_max = _amount_bounds(amount, amount_min, amount_max)
+    exact_ordinal = _ordinal(date_exact)
+    start_ordinal = _ordinal(range_start)
+    end_ordinal = _ordinal(range_end)
+    date_low = exact_ordinal if exact_ordinal is not None else start_ordinal
+    date_high = exact_ordinal if exact_ordinal is not None else end_ordinal
+    # Skip whole files outside the date window or without the account, then
+    # narrow to the rows the date or amount index puts inside the bounds
+    row_ranges = _scan_ranges(
+        store,
+        store.row_ranges(date_low, date_high, account_codes),
+        date_low,
+        date_high,
+        cents_min,
+        cents_max,
+    )
 
-    for row in _TRANSACTIONS:
-        if not _row_matches_filters(
-            row,
-            account_norm,
-            iban_norm,
-            amount,
-            amount_min,
-            amount_max,
-            date_exact,
-            range_start,
-            range_end,
-        ):
-            continue
-
-        haystack = " ".join(
-            [
-                _normalize_text(row.get("account")),
-                _normalize_text(row.get("number")),
-                _normalize_text(row.get("reason")),
-                _normalize_text(row.get("name")),
-                _normalize_text(row.get("posting_text")),
-                _normalize_text(row.get("category")),
-                _normalize_text(row.get("subcategory")),
-                _normalize_text(row.get("category_path")),
-            ]
-        )
-        score = _similarity(query_norm, haystack)
-        if query_norm and score < min_score:
-            continue
+    filters = (
+        account_codes,
+        number_codes,
+        cents_min,
+        cents_max,
+        exact_ordinal,
+        start_ordinal,
+        end_ordinal,
+    )
+    capped = min(max(1, max_results), 500)
 
-        normalized = _normalize_row(row)
+    if query_norm:
+        # Substring and word matches (score 1.0) come from the token index
+        matched = search.matching_rows(query_norm)
+        if sum(map(len, row_ranges)) < len(matched):
+            # Fewer rows left to scan than the query matches (e.g. one month)
+            candidates: Iterable[int] = sorted(
+                set(chain.from_iterable(row_ranges)).intersection(matched)
+            )
+        else:
+            candidates = matched
+    else:
+        candidates = chain.from_iterable(row_ranges)
+    rows = store.visible(candidates, hidden)
+    if any(value is not None for value in filters):
+        rows = (index for index in rows if _row_matches_filters(store, index, *filters))
+    matches = [(index, 1.0) for index in rows]
+
+    if query_norm and len(matches) < capped:
+        # Too few word matches to fill the page: add rows whose text scores
+        # at least MCP_MIN_SCORE fuzzily. Only texts that can reach it are scored.
+        fuzzy = search.fuzzy_scores(query_norm, min_score)
+        if fuzzy:
+            codes = search.codes
+            for index in store.visible(chain.from_iterable(row_ranges), hidden):
+                score = fuzzy.get(codes[index])
+                if score is not None and _row_matches_filters(store, index, *filters):
+                    matches.append((index, score))
+            # Back to row order, which the sort keeps for ties
+            matches.sort()
+
+    sorted_matches = _apply_sort(store, matches, sort)
+
+    # Only materialize dicts for the rows actually returned
+    limited: list[dict[str, Any]] = []
+    for index, score in sorted_matches[:capped]:
+        normalized = _normalize_row(store.row(index))
         normalized["score"] = round(score, 4)
-        results.append(normalized)
-
-    sorted_results = _apply_sort(results, sort)
-    capped = min(max(1, max_results), 500)
-    limited = sorted_results[:capped]
+        limited.append(normalized)
 
     return {
         "filters": {
@@ -713,16 +1223,34 @@ def search_transactions(
             "date_end": date_end,
             "sort": sort,
             "max_results": max_results,
+            "exclude_categories": exclude_categories,
+            "exclude_tags": exclude_tags,
+            "include_excluded": include_excluded,
         },
         "summary": {
-            "matched": len(results),
+            "matched": len(matches),
             "returned": len(limited),
-            "truncated": len(limited) < len(results),
+            "truncated": len(limited) < len(matches),
         },
         "results": limited,
     }
 
 
+def _group_label(store: TransactionStore, group_by: str, code: Any) -> str:
+    """Map an ``aggregate_transactions`` bucket code back to its group label."""
+    if group_by == "category":
+        return store.category_vocab.values[code] or "Uncategorized"
+    if group_by == "subcategory":
+        if isinstance(code, tuple):
+            return store.category_vocab.values[code[1]] or "Uncategorized"
+        return store.category_path_vocab.values[code]
+    if group_by == "counterparty":
+        return store.name_vocab.values[code] or "Unknown"
+    if group_by == "month":
+        return date.fromordinal(code).strftime("%Y-%m") if code != MISSING_DATE else "Unknown"
+    return store.account_vocab.values[code] or "Unknown"
+
+
 @mcp.tool(annotations={"readOnlyHint": True, "openWorldHint": False})
 def aggregate_transactions(
     group_by: str = "category",
@@ -732,6 +1260,9 @@ def aggregate_transactions(
     amount_max: float | None = None,
     date_start: str | None = None,
     date_end: str | None = None,
+    exclude_categories: list[str] | None = None,
+    exclude_tags: list[str] | None = None,
+    include_excluded: bool = False,
 ) -> dict[str, Any]:
     """[finance] Aggregate transactions into groups with totals, counts, and averages.
 
@@ -742,18 +1273,22 @@ def aggregate_transactions(
     - account, iban: string filters (same as search_transactions)
     - amount_min, amount_max: numeric filters
     - date_start, date_end: ISO dates (YYYY-MM-DD) to restrict the period
+    - exclude_categories, exclude_tags, include_excluded: per-query exclusions
+      (same as search_transactions), e.g. to compare totals with and without
+      transfers
     """
-    _ensure_loaded()
+    # Pin the generation this request started with; reloads publish a new one
+    store = _current_generation().store
 
     valid_groups = {"category", "subcategory", "counterparty", "month", "account"}
     if group_by not in valid_groups:
         raise ValueError(f"group_by must be one of: {', '.join(sorted(valid_groups))}")
 
-    account_norm = _normalize_text(account)
-    iban_norm = _normalize_text(iban)
+    account_norm = normalize_text(account)
+    iban_norm = normalize_text(iban)
 
-    range_start = _parse_date(date_start)
-    range_end = _parse_date(date_end)
+    range_start = parse_date(date_start)
+    range_end = parse_date(date_end)
     if date_start and range_start is None:
         raise ValueError("date_start must be ISO format like YYYY-MM-DD")
     if date_end and range_end is None:
@@ -764,49 +1299,102 @@ def aggregate_transactions(
         raise ValueError("amount_min must be less than or equal to amount_max")
 
     # Aggregate into buckets
-    buckets: dict[str, list[float]] = {}
+    hidden = _query_mask(store, exclude_categories, exclude_tags, include_excluded)
+    account_codes = _account_codes(store, account_norm)
+    number_codes = _number_codes(store, iban_norm)
+    cents_min, cents_max = _amount_bounds(None, amount_min, amount_max)
+    start_ordinal = _ordinal(range_start)
+    end_ordinal = _ordinal(range_end)
+    # Rows are bucketed by integer code (or date ordinal) and only mapped to
+    # labels afterwards; per code: [count, total, min, max], all in cents
+    if group_by == "category":
+        key_column = store.categories
+    elif group_by == "subcategory":
+        key_column = store.category_paths
+    elif group_by == "counterparty":
+        key_column = store.names
+    elif group_by == "month":
+        key_column = store.booking_dates
+    else:  # account
+        key_column = store.accounts
+    amounts = store.amounts
+    code_buckets: dict[Any, list[int]] = {}
     total_matched = 0
 
-    for row in _TRANSACTIONS:
+    row_ranges = _scan_ranges(
+        store,
+        store.row_ranges(start_ordinal, end_ordinal, account_codes),
+        start_ordinal,
+        end_ordinal,
+        cents_min,
+        cents_max,
+    )
+    for index in store.visible(chain.from_iterable(row_ranges), hidden):
         if not _row_matches_filters(
-            row, account_norm, iban_norm, None, amount_min, amount_max, None, range_start, range_end
+            store,
+            index,
+            account_codes,
+            number_codes,
+            cents_min,
+            cents_max,
+            None,
+            start_ordinal,
+            end_ordinal,
         ):
             continue
 
         total_matched += 1
-        row_amount = _parse_amount(row.get("amount")) or 0.0
-
-        # Determine the group key
-        if group_by == "category":
-            key = row.get("category") or "Uncategorized"
-        elif group_by == "subcategory":
-            key = row.get("category_path") or row.get("category") or "Uncategorized"
-        elif group_by == "counterparty":
-            key = row.get("name") or "Unknown"
-        elif group_by == "month":
-            row_date = _parse_date(row.get("booking_date"))
-            key = row_date.strftime("%Y-%m") if row_date else "Unknown"
-        else:  # account
-            key = row.get("account") or "Unknown"
-
-        if key not in buckets:
-            buckets[key] = []
-        buckets[key].append(row_amount)
+        cents = amounts[index]
+        if cents == MISSING_AMOUNT:
+            cents = 0
+
+        code = key_column[index]
+        if group_by == "subcategory" and not store.category_path_vocab.values[code]:
+            # Fall back to the category when the row has no category path
+            code = (code, store.categories[index])
+
+        bucket = code_buckets.get(code)
+        if bucket is None:
+            code_buckets[code] = [1, cents, cents, cents]
+        else:
+            bucket[0] += 1
+            bucket[1] += cents
+            if cents < bucket[2]:
+                bucket[2] = cents
+            elif cents > bucket[3]:
+                bucket[3] = cents
+
+    # Several codes can share a label (e.g. "" and "Uncategorized"); merge them
+    # in first-seen order so ties keep the same order as per-row labelling
+    buckets: dict[str, list[int]] = {}
+    for code, bucket in code_buckets.items():
+        key = _group_label(store, group_by, code)
+        merged = buckets.get(key)
+        if merged is None:
+            buckets[key] = bucket
+        else:
+            merged[0] += bucket[0]
+            merged[1] += bucket[1]
+            merged[2] = min(merged[2], bucket[2])
+            merged[3] = max(merged[3], bucket[3])
 
     # Build result groups sorted by total amount (largest absolute spend first)
+    # Amounts are converted back to euros only here, at the response boundary
     groups = []
-    grand_total = 0.0
-    for key, amounts in sorted(buckets.items(), key=lambda x: sum(x[1])):
-        total = round(sum(amounts), 2)
-        grand_total += total
+    grand_total_cents = 0
+    for key, (count, total_cents, min_cents, max_cents) in sorted(
+        buckets.items(), key=lambda x: x[1][1]
+    ):
+        grand_total_cents += total_cents
+        total = total_cents / 100
         groups.append(
             {
                 "group": key,
-                "count": len(amounts),
+                "count": count,
                 "total": total,
-                "average": round(total / len(amounts), 2),
-                "min": round(min(amounts), 2),
-                "max": round(max(amounts), 2),
+                "average": round(total / count, 2),
+                "min": min_cents / 100,
+                "max": max_cents / 100,
             }
         )
 
@@ -819,11 +1407,14 @@ def aggregate_transactions(
             "amount_max": amount_max,
             "date_start": date_start,
             "date_end": date_end,
+            "exclude_categories": exclude_categories,
+            "exclude_tags": exclude_tags,
+            "include_excluded": include_excluded,
         },
         "summary": {
             "transactions_matched": total_matched,
             "groups_returned": len(groups),
-            "grand_total": round(grand_total, 2),
+            "grand_total": grand_total_cents / 100,
         },
         "groups": groups,
     }
@@ -832,20 +1423,46 @@ def aggregate_transactions(
 @mcp.tool(annotations={"readOnlyHint": True, "openWorldHint": False})
 def describe_fields() -> dict[str, Any]:
     """[finance] Return current CSV configuration and expected headers."""
-    _ensure_loaded()
+    generation = _current_generation()
+    store = generation.store
     return {
         "csv_dir": str(_csv_directory()),
         "csv_glob": _csv_glob(),
         "expected_headers": list(EXPECTED_HEADERS),
-        "files_scanned": _STORE_METADATA.get("files_scanned", 0),
-        "total_records": len(_TRANSACTIONS),
+        "files_scanned": generation.metadata.get("files_scanned", 0),
+        "total_records": store.visible_count(),
+        "distinct_values": {field: len(values) for field, values in store.vocabularies().items()},
     }
 
 
 @mcp.tool(annotations={"readOnlyHint": False, "idempotentHint": True, "openWorldHint": False})
-def reload_transactions() -> dict[str, Any]:
-    """[finance] Reload CSV files and return record statistics."""
-    return _reload_transactions()
+async def reload_transactions(profile: bool = False, wait: bool = True) -> dict[str, Any]:
+    """[finance] Reload CSV files and return record statistics.
+
+    The reload runs in the background; calls made while one is in progress
+    share it and get its result.
+
+    - profile: also return a timing breakdown (per-file read/parse/normalize/
+      store seconds, rows/sec, peak memory growth); only applies when this
+      call starts the reload
+    - wait: set to false to return a job_id immediately and poll
+      health_check (reload_job) for the outcome
+    """
+    job = _RELOADS.submit(profile or None)
+    if not wait:
+        return job.describe()
+    # Shielded: a caller that goes away must not cancel the reload others share
+    result = await asyncio.shield(asyncio.wrap_future(job.future))
+    return {**result, "job_id": job.id}
+
+
+@mcp.tool(annotations={"readOnlyHint": False, "idempotentHint": True, "openWorldHint": False})
+def reload_exclusions() -> dict[str, Any]:
+    """[finance] Re-apply EXCLUDED_CATEGORIES/EXCLUDED_TAGS without re-reading CSV files.
+
+    Picks up edits to the .env file and rebuilds only the exclusion mask.
+    """
+    return _reload_exclusions()
 
 
 @mcp.tool(annotations={"readOnlyHint": True, "openWorldHint": False})
@@ -858,20 +1475,48 @@ def health_check() -> dict[str, Any]:
     - data_loaded: whether transaction data is loaded
     - record_count: number of transactions in memory
     - files_scanned: number of CSV files loaded
+    - last_reload_seconds: duration of the most recent reload
+    - generation: number of the published data generation (bumped by every
+      reload), 0 before the first load
+    - reload_job: the running or most recent reload_transactions job
+      (job_id, status, result or error), or null
     - transport_mode: current transport (stdio/http)
     """
     uptime = time.time() - _SERVER_START_TIME
+    generation = _GENERATION
+    metadata = generation.metadata if generation is not None else {}
+    reload_job = _RELOADS.last
 
     return {
         "status": "healthy",
         "uptime_seconds": round(uptime, 2),
-        "data_loaded": _DATA_LOADED,
-        "record_count": len(_TRANSACTIONS),
-        "files_scanned": _STORE_METADATA.get("files_scanned", 0),
+        "data_loaded": generation is not None,
+        "record_count": generation.store.visible_count() if generation is not None else 0,
+        "files_scanned": metadata.get("files_scanned", 0),
+        "last_reload_seconds": metadata.get("last_reload_seconds"),
+        "generation": generation.number if generation is not None else 0,
+        "reload_job": reload_job.describe() if reload_job is not None else None,
         "transport_mode": _transport_mode(),
     }
 
 
+def _start_watcher() -> FolderWatcher | None:
+    """Start the background CSV folder watcher if OUTBANK_WATCH_ENABLED is set."""
+    global _WATCHER
+    if not _env_watch_enabled() or _WATCHER is not None:
+        return _WATCHER
+    _WATCHER = FolderWatcher(
+        _csv_directory(),
+        _csv_patterns(),
+        _reload_transactions,
+        debounce_seconds=_env_float("OUTBANK_WATCH_DEBOUNCE", 2.0),
+        poll_interval=_env_float("OUTBANK_WATCH_POLL_INTERVAL", 5.0),
+        use_inotify=not _env_bool("OUTBANK_WATCH_FORCE_POLLING", False),
+    )
+    _WATCHER.start()
+    return _WATCHER
+
+
 def _transport_mode() -> str:
     mode = os.getenv("MCP_TRANSPORT", "stdio").strip().lower()
     if mode not in {"http", "stdio"}:
@@ -934,6 +1579,8 @@ def _display_startup_info() -> None:
     table.add_row("[bold cyan]CSV Directory:[/bold cyan]", f"[white]{csv_dir}[/white]")
     table.add_row("[bold cyan]CSV Pattern:[/bold cyan]", f"[white]{csv_glob}[/white]")
     table.add_row("[bold cyan]Files Scanned:[/bold cyan]", f"[white]{files_scanned}[/white]")
+    if _WATCHER is not None:
+        table.add_row("[bold cyan]Auto-reload:[/bold cyan]", f"[green]On ({_WATCHER.mode})[/green]")
 
     table.add_row("", "")  # Spacer
     table.add_row("[bold cyan]Transactions Found:[/bold cyan]", f"[white]{total_parsed:,}[/white]")
@@ -989,6 +1636,8 @@ def _display_startup_info() -> None:
 def main():
     transport = _transport_mode()
 
+    _start_watcher()
+
     # Display startup information
     _display_startup_info()
 
@@ -0,0 +1,159 @@
+"""On-disk snapshot of the normalized transaction store.
+
+A snapshot lets a fresh process (every stdio session spawns one) skip CSV
+parsing: numeric columns are stored as raw array bytes and read straight out
+of a memory-mapped file, string columns and vocabularies as JSON. The file
+also records the per-file fingerprints and load configuration (content
+dedup) it was built from, so the caller can tell which inputs changed since.
+Excluded rows are stored like any other; the exclusion mask is rebuilt on
+load. The file holds every transaction (counterparties, IBANs, reasons), so
+it is only readable by its owner.
+
+Kept free of FastMCP imports so it can be tested and reused in isolation.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Any
+
+from .ingest import FileFingerprint, LoadedFile
+from .store import TransactionStore
+
+_MAGIC = b"OBSNAP01"
+_VERSION = 5
+_HEADER_SIZE_BYTES = 8
+
+# Snapshots hold full transaction data: owner-only directory and files
+_DIR_MODE = 0o700
+_FILE_MODE = 0o600
+
+
+def snapshot_path(cache_dir: Path, csv_dir: Path, csv_glob: str) -> Path:
+    """Return the snapshot file for a CSV folder and glob inside ``cache_dir``."""
+    source = f"{csv_dir.resolve()}\n{csv_glob}".encode()
+    name = hashlib.blake2b(source, digest_size=8).hexdigest()
+    return cache_dir / f"snapshot-{name}.bin"
+
+
+def write_snapshot(
+    path: Path,
+    store: TransactionStore,
+    registry: dict[str, LoadedFile],
+    config: Any,
+) -> None:
+    """Write a snapshot atomically (temp file + rename), readable only by the owner.
+
+    A missing snapshot directory is created with mode 0700; the file is
+    created with mode 0600 before any data is written to it.
+    """
+    blobs: list[bytes] = []
+    offset = 0
+    columns: dict[str, list[Any]] = {}
+    for name in store.COLUMNS:
+        column = getattr(store, name)
+        if isinstance(column, array):
+            data = column.tobytes()
+            columns[name] = [column.typecode, offset, len(data)]
+        else:
+            data = json.dumps(column, ensure_ascii=False).encode("utf-8")
+            columns[name] = ["json", offset, len(data)]
+        blobs.append(data)
+        offset += len(data)
+
+    header = {
+        "version": _VERSION,
+        "byteorder": sys.byteorder,
+        "rows": len(store),
+        "config": config,
+        "registry": {key: [*loaded.fingerprint, *loaded[1:]] for key, loaded in registry.items()},
+        "vocabularies": {
+            name: getattr(store, name).values for name in store.CODED_COLUMNS.values()
+        },
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    path.parent.mkdir(mode=_DIR_MODE, parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.unlink(missing_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, _FILE_MODE)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_MAGIC)
+            handle.write(len(header_bytes).to_bytes(_HEADER_SIZE_BYTES, "little"))
+            handle.write(header_bytes)
+            for blob in blobs:
+                handle.write(blob)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def read_snapshot(path: Path, config: Any) -> tuple[TransactionStore, dict[str, LoadedFile]] | None:
+    """Load a snapshot, or return None if it is missing, stale or unreadable.
+
+    A snapshot built with a different load configuration is stale, since
+    collapsed rows were never stored.
+    """
+    try:
+        with (
+            path.open("rb") as handle,
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            return _decode(mm, config)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _decode(mm: mmap.mmap, config: Any) -> tuple[TransactionStore, dict[str, LoadedFile]] | None:
+    if mm[: len(_MAGIC)] != _MAGIC:
+        return None
+    header_start = len(_MAGIC) + _HEADER_SIZE_BYTES
+    header_size = int.from_bytes(mm[len(_MAGIC) : header_start], "little")
+    header = json.loads(mm[header_start : header_start + header_size].decode("utf-8"))
+    if header["version"] != _VERSION or header["byteorder"] != sys.byteorder:
+        return None
+    # JSON turns tuples into lists; compare in the same shape
+    if header["config"] != json.loads(json.dumps(config)):
+        return None
+
+    store = TransactionStore()
+    if set(header["columns"]) != set(store.COLUMNS) or set(header["vocabularies"]) != set(
+        store.CODED_COLUMNS.values()
+    ):
+        return None
+    for name, values in header["vocabularies"].items():
+        vocab = getattr(store, name)
+        for value in values:
+            vocab.encode(value)
+
+    data_start = header_start + header_size
+    view = memoryview(mm)
+    try:
+        for name, (kind, offset, size) in header["columns"].items():
+            start = data_start + offset
+            if kind == "json":
+                setattr(store, name, json.loads(str(view[start : start + size], "utf-8")))
+            else:
+                column = array(kind)
+                column.frombytes(view[start : start + size])
+                setattr(store, name, column)
+    finally:
+        view.release()
+
+    if any(len(getattr(store, name)) != header["rows"] for name in store.COLUMNS):
+        return None
+
+    registry = {
+        key: LoadedFile(FileFingerprint(size, mtime_ns, digest), *rest)
+        for key, (size, mtime_ns, digest, *rest) in header["registry"].items()
+    }
+    # File manifests are cheap to recompute from the columns
+    for loaded in registry.values():
+        store.add_partition(loaded.start, loaded.stop)
+    return store, registry
@@ -0,0 +1,698 @@
+"""Columnar in-memory transaction store.
+
+Transactions are held column by column instead of as one dict per row:
+booking/value dates as integer ordinals, amounts as exact integer cents, and
+repeated strings (account, bank, category, counterparty, tags, ...) as
+dictionary codes, so each distinct value is held once and filters and
+group-bys can compare integer codes.
+Tools read straight from the columns and only materialize dicts for the rows
+they actually return.
+
+Every parsed row is kept; exclusion filters are applied as a per-row mask
+(see ``apply_exclusions``) that can be rebuilt without re-reading any CSV.
+Rows repeating a record key are kept too and hidden by the same mask, so an
+excluded copy never shadows a visible one.
+Range filters on booking dates and amounts use row permutations sorted by
+that column (see ``sorted_index``), so a month or an amount range is found
+with two binary searches and an exact amount with one dictionary lookup.
+
+Kept free of FastMCP imports so it can be tested and reused in isolation.
+"""
+
+import copy
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from itertools import compress, filterfalse
+from typing import Any, NamedTuple
+
+from .exclusion_filters import ExclusionMatcher
+
+# Sentinels for missing values in the numeric columns
+MISSING_DATE = 0
+MISSING_AMOUNT = -(2**63)
+
+# Per-pattern exclusion masks kept per store (one byte per row each)
+PATTERN_MASK_CACHE_SIZE = 32
+
+# Numeric columns ``sorted_index`` can order rows by, with their missing-value sentinel
+SORTABLE_COLUMNS = {"booking_dates": MISSING_DATE, "amounts": MISSING_AMOUNT}
+
+
+class Vocabulary:
+    """Dictionary encoding for a repeated string column.
+
+    Each distinct value is stored once and rows hold its integer code.
+    """
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def copy(self) -> "Vocabulary":
+        clone = Vocabulary()
+        clone.values = list(self.values)
+        clone._codes = dict(self._codes)
+        return clone
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: str) -> int | None:
+        return self._codes.get(value)
+
+    def codes_containing(self, needle: str) -> set[int]:
+        """Return codes whose lowercased value contains the (lowercase) needle."""
+        return {code for code, value in enumerate(self.values) if needle in value.lower()}
+
+
+def join_tags(tags: Any) -> str:
+    """Encode a tag list as one vocabulary value (tags never contain commas)."""
+    return ",".join(tags)
+
+
+def split_tag_set(value: str) -> tuple[str, ...]:
+    return tuple(value.split(",")) if value else ()
+
+
+def ordinal_to_date(value: int) -> date | None:
+    if value == MISSING_DATE:
+        return None
+    return date.fromordinal(value)
+
+
+class Transaction:
+    """One normalized transaction with typed, pre-parsed fields.
+
+    Dates are ordinals (``MISSING_DATE`` when absent), amounts integer cents
+    (None when absent) and tags a tuple. This is the internal record passed
+    between ingestion stages and returned by ``TransactionStore.row``; the
+    public response shape is only built by the server.
+    """
+
+    __slots__ = (
+        "id",
+        "account",
+        "booking_date",
+        "value_date",
+        "amount",
+        "currency",
+        "name",
+        "number",
+        "bank",
+        "reason",
+        "category",
+        "subcategory",
+        "category_path",
+        "tags",
+        "note",
+        "posting_text",
+        "source_file",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        account: str,
+        booking_date: int,
+        value_date: int,
+        amount: int | None,
+        currency: str,
+        name: str,
+        number: str,
+        bank: str,
+        reason: str,
+        category: str,
+        subcategory: str,
+        category_path: str,
+        tags: tuple[str, ...],
+        note: str,
+        posting_text: str,
+        source_file: str,
+    ) -> None:
+        self.id = id
+        self.account = account
+        self.booking_date = booking_date
+        self.value_date = value_date
+        self.amount = amount
+        self.currency = currency
+        self.name = name
+        self.number = number
+        self.bank = bank
+        self.reason = reason
+        self.category = category
+        self.subcategory = subcategory
+        self.category_path = category_path
+        self.tags = tags
+        self.note = note
+        self.posting_text = posting_text
+        self.source_file = source_file
+
+    @property
+    def record_key(self) -> str:
+        return f"{self.source_file}:{self.id}"
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Mapping-style read, so dict-based helpers (exclusion filters) accept records."""
+        return getattr(self, field, default)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.record_key!r}, amount={self.amount!r})"
+
+
+class Partition(NamedTuple):
+    """Manifest of one source file's contiguous row range.
+
+    ``min_date``/``max_date`` span the booking dates present (both
+    ``MISSING_DATE`` when no row has one) and ``accounts`` holds the account
+    codes present, so date- or account-bounded queries can skip whole files.
+    """
+
+    start: int
+    stop: int
+    min_date: int
+    max_date: int
+    accounts: frozenset[int]
+
+    def may_match(
+        self, date_start: int | None, date_end: int | None, account_codes: set[int] | None
+    ) -> bool:
+        if date_start is not None or date_end is not None:
+            if self.min_date == MISSING_DATE:
+                return False
+            if date_start is not None and self.max_date < date_start:
+                return False
+            if date_end is not None and self.min_date > date_end:
+                return False
+        return account_codes is None or not self.accounts.isdisjoint(account_codes)
+
+
+class SortedIndex(NamedTuple):
+    """Row ids ordered by one numeric column, for range lookups.
+
+    Rows holding the column's missing-value sentinel are left out. Rows with
+    equal values stay in row order.
+    """
+
+    rows: array
+    values: array
+    # Distinct value -> first position in ``values`` and the position past its last
+    starts: dict[int, int]
+    stops: dict[int, int]
+    # Rows in the store when the index was built
+    row_count: int
+
+    def equal(self, value: int) -> array:
+        """Return the rows holding exactly ``value``, in row order."""
+        start = self.starts.get(value)
+        if start is None:
+            return self.rows[0:0]
+        return self.rows[start : self.stops[value]]
+
+    def between(self, low: int | None = None, high: int | None = None) -> array:
+        """Return the rows whose value lies in ``low..high`` (inclusive; None is unbounded).
+
+        The rows come back ordered by value, not by row id.
+        """
+        start = 0 if low is None else bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect_right(self.values, high)
+        return self.rows[start:stop]
+
+
+class TransactionStore:
+    """Column-oriented container for normalized transactions."""
+
+    COLUMNS = (
+        "ids",
+        "booking_dates",
+        "value_dates",
+        "amounts",
+        "reasons",
+        "notes",
+        "posting_texts",
+        "names",
+        "numbers",
+        "tag_sets",
+        "accounts",
+        "currencies",
+        "banks",
+        "categories",
+        "subcategories",
+        "category_paths",
+        "source_files",
+    )
+
+    CODED_COLUMNS = {
+        "names": "name_vocab",
+        "numbers": "number_vocab",
+        "tag_sets": "tag_set_vocab",
+        "accounts": "account_vocab",
+        "currencies": "currency_vocab",
+        "banks": "bank_vocab",
+        "categories": "category_vocab",
+        "subcategories": "subcategory_vocab",
+        "category_paths": "category_path_vocab",
+        "source_files": "source_file_vocab",
+    }
+
+    # Coded column -> normalized transaction field it encodes
+    CODED_FIELDS = {
+        "names": "name",
+        "numbers": "number",
+        "accounts": "account",
+        "currencies": "currency",
+        "banks": "bank",
+        "categories": "category",
+        "subcategories": "subcategory",
+        "category_paths": "category_path",
+        "source_files": "source_file",
+    }
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.booking_dates = array("i")
+        self.value_dates = array("i")
+        self.amounts = array("q")
+        self.reasons: list[str] = []
+        self.notes: list[str] = []
+        self.posting_texts: list[str] = []
+
+        self.name_vocab = Vocabulary()
+        self.number_vocab = Vocabulary()
+        # Values are comma-joined tag lists (see ``join_tags``)
+        self.tag_set_vocab = Vocabulary()
+        self.account_vocab = Vocabulary()
+        self.currency_vocab = Vocabulary()
+        self.bank_vocab = Vocabulary()
+        self.category_vocab = Vocabulary()
+        self.subcategory_vocab = Vocabulary()
+        self.category_path_vocab = Vocabulary()
+        self.source_file_vocab = Vocabulary()
+
+        self.names = array("I")
+        self.numbers = array("I")
+        self.tag_sets = array("I")
+        self.accounts = array("I")
+        self.currencies = array("I")
+        self.banks = array("I")
+        self.categories = array("I")
+        self.subcategories = array("I")
+        self.category_paths = array("I")
+        self.source_files = array("I")
+
+        # Per-file manifests, in row order (see ``add_partition``)
+        self.partitions: list[Partition] = []
+
+        # One byte per row, 1 where exclusion filters hide it or it repeats the
+        # record key of a visible row (see ``apply_exclusions``)
+        self.excluded = bytearray()
+        # Rows the configured filters alone exclude, before duplicates are hidden
+        self._filtered: bytes = b""
+        self.excluded_count = 0
+        self.hidden_count = 0
+        # (row count, groups of rows sharing a record key), see ``duplicate_rows``
+        self._duplicate_rows: tuple[int, list[list[int]]] = (0, [])
+        # Record-key duplicates hidden when no exclusions apply, see ``query_mask``
+        self._unfiltered: bytes | None = None
+        # (kind, pattern) -> mask, see ``pattern_mask``
+        self._pattern_masks: dict[tuple[str, str | None], bytes] = {}
+        # Column name -> index, see ``sorted_index``
+        self._sorted_indexes: dict[str, SortedIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def exclusion_mask(self, matcher: ExclusionMatcher) -> bytearray:
+        """Return one byte per row, 1 where ``matcher`` excludes the row.
+
+        Verdicts are taken once per distinct category, subcategory, category
+        path and tag set, then spread over the rows by code, so this costs a
+        pass over a few code columns and no string matching per row.
+        """
+        mask = bytearray(len(self))
+        if not matcher:
+            return mask
+        tag_verdicts = [
+            any(matcher.matches_tag(tag) for tag in split_tag_set(value))
+            for value in self.tag_set_vocab.values
+        ]
+        checks = [
+            (self.categories, self.category_vocab, matcher.matches_category),
+            (self.subcategories, self.subcategory_vocab, matcher.matches_category),
+            (self.category_paths, self.category_path_vocab, matcher.matches_category),
+        ]
+        verdict_columns = [
+            (column, [check(value) for value in vocab.values]) for column, vocab, check in checks
+        ]
+        verdict_columns.append((self.tag_sets, tag_verdicts))
+        for column, verdicts in verdict_columns:
+            if not any(verdicts):
+                continue
+            for index in compress(range(len(mask)), map(verdicts.__getitem__, column)):
+                mask[index] = 1
+        return mask
+
+    def duplicate_rows(self) -> list[list[int]]:
+        """Return (cached) groups of rows sharing a ``source_file:id`` record key.
+
+        Each group is in row order. Exports rarely repeat a record id, so this
+        is usually empty.
+        """
+        row_count, groups = self._duplicate_rows
+        if row_count != len(self):
+            keys = list(zip(self.source_files, self.ids, strict=True))
+            groups = []
+            if len(set(keys)) != len(keys):
+                rows_by_key: dict[tuple[int, str], list[int]] = {}
+                for index, key in enumerate(keys):
+                    rows_by_key.setdefault(key, []).append(index)
+                groups = [rows for rows in rows_by_key.values() if len(rows) > 1]
+            self._duplicate_rows = (len(self), groups)
+        return groups
+
+    def _hide_duplicates(self, mask: bytearray) -> None:
+        """Set ``mask`` for rows repeating the record key of an earlier row it leaves visible.
+
+        Only the first copy that is not already hidden stays visible, so a
+        copy hidden by an exclusion never shadows one that is not.
+        """
+        for rows in self.duplicate_rows():
+            shown = False
+            for index in rows:
+                if mask[index]:
+                    continue
+                if shown:
+                    mask[index] = 1
+                shown = True
+
+    def apply_exclusions(self, matcher: ExclusionMatcher) -> int:
+        """Rebuild the configured exclusion mask and return the excluded row count.
+
+        The count covers every row the filters exclude, repeated record keys
+        included; the mask also hides record-key duplicates of visible rows.
+        Modifies this store; use ``with_exclusions`` for a store readers may
+        already be using.
+        """
+        mask = self.exclusion_mask(matcher)
+        self.excluded_count = mask.count(1)
+        self._filtered = bytes(mask)
+        self._hide_duplicates(mask)
+        self.excluded = mask
+        self.hidden_count = mask.count(1)
+        return self.excluded_count
+
+    def with_exclusions(self, matcher: ExclusionMatcher) -> "TransactionStore":
+        """Return a copy of this store with a new exclusion mask.
+
+        The copy shares the columns, vocabularies, cached pattern masks and
+        sorted indexes (the rows are the same); only the configured mask
+        differs.
+        """
+        clone = copy.copy(self)
+        clone.apply_exclusions(matcher)
+        return clone
+
+    def pattern_mask(self, category: str | None = None, tag: str | None = None) -> bytes:
+        """Return the (cached) mask of rows matching one category or tag exclusion.
+
+        Masks are kept per pattern, so a query combining exclusions that were
+        seen before only ORs cached masks together (see ``query_mask``).
+        """
+        key = ("category", category) if category is not None else ("tag", tag)
+        mask = self._pattern_masks.get(key)
+        if mask is None or len(mask) != len(self):
+            matcher = ExclusionMatcher(
+                [category] if category is not None else [], [tag] if tag is not None else []
+            )
+            mask = bytes(self.exclusion_mask(matcher))
+            if len(self._pattern_masks) >= PATTERN_MASK_CACHE_SIZE:
+                # Evict the oldest entry; queries tend to reuse the same few patterns
+                self._pattern_masks.pop(next(iter(self._pattern_masks)), None)
+            self._pattern_masks[key] = mask
+        return mask
+
+    def sorted_index(self, name: str) -> SortedIndex:
+        """Return the (cached) ``SortedIndex`` of a column in ``SORTABLE_COLUMNS``.
+
+        Built with one sort on first use and kept until rows are added, so
+        every later range lookup is two binary searches and every exact
+        lookup a dictionary hit.
+        """
+        index = self._sorted_indexes.get(name)
+        if index is None or index.row_count != len(self):
+            column = getattr(self, name)
+            missing = SORTABLE_COLUMNS[name]
+            rows = sorted(
+                (row for row in range(len(column)) if column[row] != missing),
+                key=column.__getitem__,
+            )
+            values = array(column.typecode, map(column.__getitem__, rows))
+            index = SortedIndex(
+                array("I", rows),
+                values,
+                # Later positions overwrite earlier ones, so iterate each way once
+                dict(zip(reversed(values), range(len(values) - 1, -1, -1), strict=True)),
+                dict(zip(values, range(1, len(values) + 1), strict=True)),
+                len(self),
+            )
+            self._sorted_indexes[name] = index
+        return index
+
+    def query_mask(
+        self,
+        categories: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        include_excluded: bool = False,
+    ) -> bytes | bytearray:
+        """Return the rows one query hides: the configured exclusions plus per-query ones.
+
+        ``categories``/``tags`` are normalized (lowercase, stripped) exclusion
+        values; ``include_excluded`` drops the configured exclusions. Record-key
+        duplicates are hidden after all exclusions are combined, so a record
+        whose first copy a query excludes is still shown through a later copy.
+        """
+        patterns = [self.pattern_mask(category=category) for category in categories]
+        patterns.extend(self.pattern_mask(tag=tag) for tag in tags)
+        if not patterns:
+            if not include_excluded:
+                return self.excluded
+            if self._unfiltered is None or len(self._unfiltered) != len(self):
+                unfiltered = bytearray(len(self))
+                self._hide_duplicates(unfiltered)
+                self._unfiltered = bytes(unfiltered)
+            return self._unfiltered
+        if not include_excluded:
+            patterns.append(self._filtered)
+        # Bytes are 0 or 1, so OR-ing the masks as big integers ORs them row by row
+        combined = 0
+        for mask in patterns:
+            if len(mask) == len(self):
+                combined |= int.from_bytes(mask, "little")
+        hidden = bytearray(combined.to_bytes(len(self), "little"))
+        self._hide_duplicates(hidden)
+        return hidden
+
+    def visible_count(self) -> int:
+        """Number of rows not hidden by the exclusion mask."""
+        return len(self) - self.hidden_count
+
+    def visible(
+        self, indices: Iterable[int], hidden: bytes | bytearray | None = None
+    ) -> Iterator[int]:
+        """Drop hidden rows from ``indices``.
+
+        ``hidden`` defaults to the configured exclusion mask; pass a
+        ``query_mask`` to apply per-query exclusions instead.
+        """
+        if hidden is None:
+            if not self.hidden_count:
+                return iter(indices)
+            hidden = self.excluded
+        elif len(hidden) != len(self) or 1 not in hidden:
+            return iter(indices)
+        return filterfalse(hidden.__getitem__, indices)
+
+    def add_partition(self, start: int, stop: int) -> Partition:
+        """Record rows ``start:stop`` as one file and summarize them for pruning."""
+        dates = self.booking_dates[start:stop]
+        partition = Partition(
+            start,
+            stop,
+            min(filter(None, dates), default=MISSING_DATE),
+            max(dates, default=MISSING_DATE),
+            frozenset(self.accounts[start:stop]),
+        )
+        self.partitions.append(partition)
+        return partition
+
+    def row_ranges(
+        self,
+        date_start: int | None = None,
+        date_end: int | None = None,
+        account_codes: set[int] | None = None,
+    ) -> list[range]:
+        """Return the row ranges of files that can hold rows matching the bounds.
+
+        Date bounds are inclusive ordinals; files outside them, or without any
+        of ``account_codes``, are skipped without touching their rows.
+        """
+        if not self.partitions:
+            return [range(len(self))]
+        return [
+            range(partition.start, partition.stop)
+            for partition in self.partitions
+            if partition.may_match(date_start, date_end, account_codes)
+        ]
+
+    def derive(self) -> "TransactionStore":
+        """Return an empty store that shares this store's dictionary codes.
+
+        Row ranges can then be copied over with ``extend_from`` without
+        re-encoding the coded columns.
+        """
+        derived = TransactionStore()
+        for name in self.CODED_COLUMNS.values():
+            setattr(derived, name, getattr(self, name).copy())
+        return derived
+
+    def extend_from(self, other: "TransactionStore", start: int, stop: int) -> None:
+        """Append rows ``start:stop`` of a store this one was derived from."""
+        for name in self.COLUMNS:
+            getattr(self, name).extend(getattr(other, name)[start:stop])
+
+    def extend(self, other: "TransactionStore") -> None:
+        """Append all rows of an independently built store, re-encoding its codes."""
+        for name in self.COLUMNS:
+            column = getattr(other, name)
+            vocab_name = self.CODED_COLUMNS.get(name)
+            if vocab_name is not None:
+                vocab = getattr(self, vocab_name)
+                remap = [vocab.encode(value) for value in getattr(other, vocab_name).values]
+                column = [remap[code] for code in column]
+            getattr(self, name).extend(column)
+
+    def record_keys(self, start: int, stop: int, visible_only: bool = False) -> set[str]:
+        """Return the ``source_file:id`` record keys for a row range.
+
+        ``visible_only`` skips rows hidden by the exclusion mask.
+        """
+        indices: Iterable[int] = range(start, stop)
+        if visible_only:
+            indices = self.visible(indices)
+        return {f"{self.source_file(index)}:{self.ids[index]}" for index in indices}
+
+    def content_key(self, index: int) -> tuple[int, int, int, int, str]:
+        """Return the content fingerprint used to match a row across exports.
+
+        Account, booking date, amount, counterparty and reason; coded fields
+        compare by code, which is exact within one store.
+        """
+        return (
+            self.accounts[index],
+            self.booking_dates[index],
+            self.amounts[index],
+            self.names[index],
+            self.reasons[index],
+        )
+
+    def retain(self, start: int, indices: list[int]) -> None:
+        """Keep only the rows ``indices`` (ascending, all >= ``start``) of the tail ``start:``."""
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            kept = [column[index] for index in indices]
+            column[start:] = array(column.typecode, kept) if isinstance(column, array) else kept
+
+    def append(self, transaction: Transaction) -> None:
+        """Append one normalized transaction."""
+        self.extend_rows((transaction,))
+
+    def extend_rows(self, transactions: Sequence[Transaction]) -> None:
+        """Append a chunk of normalized transactions, one column at a time."""
+        self.ids.extend([t.id for t in transactions])
+        self.booking_dates.extend([t.booking_date for t in transactions])
+        self.value_dates.extend([t.value_date for t in transactions])
+        self.amounts.extend(
+            [MISSING_AMOUNT if t.amount is None else t.amount for t in transactions]
+        )
+        self.reasons.extend([t.reason for t in transactions])
+        self.notes.extend([t.note for t in transactions])
+        self.posting_texts.extend([t.posting_text for t in transactions])
+        encode_tags = self.tag_set_vocab.encode
+        self.tag_sets.extend([encode_tags(join_tags(t.tags)) for t in transactions])
+
+        for column, field in self.CODED_FIELDS.items():
+            encode = getattr(self, self.CODED_COLUMNS[column]).encode
+            getattr(self, column).extend([encode(getattr(t, field)) for t in transactions])
+
+    def vocabularies(self) -> dict[str, list[str]]:
+        """Return the distinct values of each coded field, indexed by code."""
+        return {
+            field: getattr(self, self.CODED_COLUMNS[column]).values
+            for column, field in self.CODED_FIELDS.items()
+        } | {"tags": self.tag_set_vocab.values}
+
+    def name(self, index: int) -> str:
+        return self.name_vocab.values[self.names[index]]
+
+    def number(self, index: int) -> str:
+        return self.number_vocab.values[self.numbers[index]]
+
+    def tags(self, index: int) -> tuple[str, ...]:
+        return split_tag_set(self.tag_set_vocab.values[self.tag_sets[index]])
+
+    def account(self, index: int) -> str:
+        return self.account_vocab.values[self.accounts[index]]
+
+    def category(self, index: int) -> str:
+        return self.category_vocab.values[self.categories[index]]
+
+    def subcategory(self, index: int) -> str:
+        return self.subcategory_vocab.values[self.subcategories[index]]
+
+    def category_path(self, index: int) -> str:
+        return self.category_path_vocab.values[self.category_paths[index]]
+
+    def source_file(self, index: int) -> str:
+        return self.source_file_vocab.values[self.source_files[index]]
+
+    def row(self, index: int) -> Transaction:
+        """Materialize one row as a ``Transaction`` record."""
+        amount = self.amounts[index]
+        return Transaction(
+            self.ids[index],
+            self.account(index),
+            self.booking_dates[index],
+            self.value_dates[index],
+            None if amount == MISSING_AMOUNT else amount,
+            self.currency_vocab.values[self.currencies[index]],
+            self.name(index),
+            self.number(index),
+            self.bank_vocab.values[self.banks[index]],
+            self.reasons[index],
+            self.category(index),
+            self.subcategory(index),
+            self.category_path(index),
+            self.tags(index),
+            self.notes[index],
+            self.posting_texts[index],
+            self.source_file(index),
+        )
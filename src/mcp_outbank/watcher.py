@@ -0,0 +1,118 @@
+"""Background watcher that reloads transactions when CSV exports change.
+
+Uses inotify (through ``watchfiles``, when installed) to wake up on changes,
+and falls back to polling the folder otherwise. Bursts of writes are
+debounced: a reload only starts once the matching files' sizes and mtimes
+have stayed the same for a full debounce interval, so files that are still
+being written are not picked up half-finished.
+
+Kept free of FastMCP imports so it can be tested and reused in isolation.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - depends on the environment
+    watchfiles = None
+
+_logger = logging.getLogger(__name__)
+
+FolderSignature = dict[str, tuple[int, int]]
+
+
+def folder_signature(directory: Path, pattern: str | Sequence[str]) -> FolderSignature:
+    """Return ``{path: (size, mtime_ns)}`` for the files matching ``pattern``(s)."""
+    patterns = [pattern] if isinstance(pattern, str) else pattern
+    signature: FolderSignature = {}
+    for glob_pattern in patterns:
+        for path in directory.glob(glob_pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                # Deleted between glob and stat; it shows up as gone next time
+                continue
+            signature[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return signature
+
+
+class FolderWatcher:
+    """Call ``on_change`` in a background thread after the folder settles."""
+
+    def __init__(
+        self,
+        directory: Path,
+        pattern: str | Sequence[str],
+        on_change: Callable[[], None],
+        debounce_seconds: float = 2.0,
+        poll_interval: float = 5.0,
+        use_inotify: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.pattern = pattern
+        self._patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and watchfiles is not None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._applied: FolderSignature = {}
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.use_inotify else "polling"
+
+    def start(self) -> None:
+        self._applied = folder_signature(self.directory, self.pattern)
+        self._thread = threading.Thread(target=self._run, name="outbank-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        if self.use_inotify:
+            try:
+                for _changes in watchfiles.watch(
+                    self.directory,
+                    stop_event=self._stop,
+                    debounce=int(self.debounce_seconds * 1000),
+                    recursive=any("**" in pattern for pattern in self._patterns),
+                ):
+                    self._settle_and_reload()
+                return
+            except Exception as exc:
+                if self._stop.is_set():
+                    return
+                _logger.warning("inotify watch failed (%s); falling back to polling", exc)
+                self.use_inotify = False
+        while not self._stop.wait(self.poll_interval):
+            self._settle_and_reload()
+
+    def _settle_and_reload(self) -> None:
+        """Wait until matching files stop changing, then reload if they differ."""
+        signature = folder_signature(self.directory, self.pattern)
+        if signature == self._applied:
+            return
+        while not self._stop.wait(self.debounce_seconds):
+            settled = folder_signature(self.directory, self.pattern)
+            if settled == signature:
+                break
+            signature = settled
+        else:
+            return
+
+        try:
+            self.on_change()
+        except Exception as exc:
+            # Keep serving the previous store; retried on the next change or poll
+            _logger.warning("Background reload failed: %s", exc)
+            return
+        self._applied = signature
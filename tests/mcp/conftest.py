@@ -12,6 +12,8 @@ from typing import Any
 import pytest
 import requests
 
+from mcp_outbank.store import Transaction
+
 # Token used by the managed HTTP server; must match server env.
 _TEST_HTTP_AUTH_TOKEN = "test-token-12345678"
 
@@ -311,6 +313,56 @@ class HttpMCPClient:
             )
 
 
+EXPORT_HEADER = (
+    "#;Account;Date;Value Date;Amount;Currency;Name;Number;Bank;Reason;"
+    "Category;Subcategory;Category-Path;Tags;Note;Posting Text\n"
+)
+
+
+def write_export(path: Path, rows: list[tuple[str, str, str]]) -> None:
+    """Write an Outbank CSV export with one row per ``(id, amount, category)``.
+
+    Rewriting an existing file moves its mtime forward, so the change is seen
+    by the file fingerprint even on coarse filesystem clocks.
+    """
+    lines = [EXPORT_HEADER]
+    for row_id, amount, category in rows:
+        lines.append(
+            f"{row_id};DE00;18.01.2026;19.01.2026;{amount};EUR;Shop;123;Bank;Reason;"
+            f"{category};Sub;{category} / Sub;;;Card payment\n"
+        )
+    existed = path.exists()
+    mtime_ns = path.stat().st_mtime_ns if existed else 0
+    path.write_text("".join(lines), encoding="utf-8")
+    if existed:
+        os.utime(path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+
+
+def make_transaction(**overrides: Any) -> Transaction:
+    """Build a store ``Transaction`` with sample values, overriding any field by name."""
+    fields = {
+        "id": "1",
+        "account": "DE00123456780000000000",
+        "booking_date": 739634,  # 2026-01-18
+        "value_date": 739635,
+        "amount": -1311,
+        "currency": "EUR",
+        "name": "Merchant A",
+        "number": "49277105",
+        "bank": "Sample Bank",
+        "reason": "Parking zone 5",
+        "category": "Category A",
+        "subcategory": "Subcategory A",
+        "category_path": "Category A / Subcategory A",
+        "tags": ("commute", "work"),
+        "note": "Receipt stored",
+        "posting_text": "Card payment",
+        "source_file": "export.csv",
+    }
+    fields.update(overrides)
+    return Transaction(**fields)
+
+
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
     """Run stdio tests first, then HTTP tests (so HTTP server starts only when needed)."""
 
@@ -407,6 +459,26 @@ def http_client_no_auth(mcp_http_server: str) -> HttpMCPClient:
     return HttpMCPClient(url=mcp_http_server, auth_token=None)
 
 
+@pytest.fixture
+def csv_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the in-process server at an empty folder, with no generation published yet."""
+    from mcp_outbank import server
+
+    monkeypatch.setenv("OUTBANK_CSV_DIR", str(tmp_path))
+    monkeypatch.setenv("OUTBANK_SNAPSHOT_ENABLED", "0")
+    for name in (
+        "OUTBANK_CSV_GLOB",
+        "OUTBANK_CONTENT_DEDUP",
+        "OUTBANK_INGEST_WORKERS",
+        "EXCLUDED_CATEGORIES",
+        "EXCLUDED_TAGS",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(server, "_DOTENV_PATH", "")
+    monkeypatch.setattr(server, "_GENERATION", None)
+    return tmp_path
+
+
 @pytest.fixture
 def workflow_context() -> dict[str, Any]:
     """Fixture for sharing data between BDD workflow steps."""
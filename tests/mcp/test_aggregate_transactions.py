@@ -182,6 +182,26 @@ class TestStdioAggregateTransactions:
         content = response["result"]["content"][0]
         assert response["result"].get("isError") is True or "less than or equal" in content["text"]
 
+    def test_aggregate_with_per_query_exclusions(self, stdio_client):
+        """Test exclude_categories hides a category for one call only."""
+        data = _call_aggregate(stdio_client, group_by="category")
+        groups = {group["group"]: group for group in data["groups"]}
+        excluded_group = next(iter(groups))
+
+        excluded = _call_aggregate(
+            stdio_client, group_by="category", exclude_categories=[excluded_group.lower()]
+        )
+        assert excluded["filters"]["exclude_categories"] == [excluded_group.lower()]
+        assert excluded_group not in {group["group"] for group in excluded["groups"]}
+        assert (
+            excluded["summary"]["transactions_matched"]
+            == data["summary"]["transactions_matched"] - groups[excluded_group]["count"]
+        )
+
+        # Without configured exclusions, include_excluded changes nothing
+        included = _call_aggregate(stdio_client, group_by="category", include_excluded=True)
+        assert included["groups"] == data["groups"]
+
 
 class TestHttpAggregateTransactions:
     """Aggregate transaction tests for HTTP transport."""
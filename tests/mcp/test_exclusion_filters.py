@@ -15,12 +15,16 @@ See README.md "Configuration" section for user-facing documentation.
 
 import json
 
+import pytest
+
 from exclusion_filters import (
+    ExclusionMatcher,
     env_exclusion_list,
     matches_exclusion,
     should_exclude_transaction,
 )
-from tests.mcp.conftest import StdioMCPClient
+from mcp_outbank import server
+from tests.mcp.conftest import StdioMCPClient, write_export
 
 # Use the module-level functions directly (no underscore prefix)
 _env_exclusion_list = env_exclusion_list
@@ -170,6 +174,41 @@ class TestExclusionFilterLogic:
         assert _should_exclude_transaction(transaction) is False
 
 
+class TestExclusionMatcher:
+    """Unit tests for the compiled matcher used when loading CSV files."""
+
+    def test_matcher_agrees_with_matches_exclusion(self):
+        """Test the combined pattern gives the same verdicts as the list helper."""
+        exclusions = ["transfer", "Savings", "a.b", "(x)"]
+        matcher = ExclusionMatcher(exclusions, exclusions)
+        values = ["Internal-Transfer", "SAVINGS plan", "aXb", "a.b", "tag (x)", "Groceries", ""]
+        for value in values:
+            expected = matches_exclusion(value, exclusions)
+            assert matcher.matches_category(value) is expected
+            assert matcher.matches_tag(value) is expected
+
+    def test_matcher_checks_each_category_field_and_tag(self):
+        """Test category exclusions cover subcategory and path, tag exclusions each tag."""
+        matcher = ExclusionMatcher(["transfer"], ["skip"])
+        assert matcher.excludes({"category": "Finances", "subcategory": "Transfer"})
+        assert matcher.excludes({"category_path": "Finances / Transfer", "tags": []})
+        assert matcher.excludes({"category": "Food", "tags": ["keep", "Skip-me"]})
+        assert not matcher.excludes({"category": "Food", "tags": ["keep"]})
+
+    def test_matcher_is_falsy_without_exclusions(self):
+        """Test an empty matcher excludes nothing and reports itself as disabled."""
+        matcher = ExclusionMatcher()
+        assert not matcher
+        assert not matcher.excludes({"category": "Transfer", "tags": ["transfer"]})
+
+    def test_should_exclude_transaction_uses_given_matcher(self, monkeypatch):
+        """Test a passed-in matcher takes precedence over the environment."""
+        monkeypatch.setenv("EXCLUDED_CATEGORIES", "transfer")
+        transaction = {"category": "Transfer", "tags": []}
+        assert _should_exclude_transaction(transaction, ExclusionMatcher()) is False
+        assert _should_exclude_transaction(transaction) is True
+
+
 class TestStdioExclusionFilters:
     """Integration tests for exclusion filters with stdio transport."""
 
@@ -387,3 +426,58 @@ class TestStdioExclusionFilters:
 
         finally:
             client.stop()
+
+
+class TestReloadExclusions:
+    """In-process tests for rebuilding the exclusion mask of the loaded rows."""
+
+    @pytest.mark.parametrize("source", ["environment", "dotenv"])
+    def test_reload_exclusions_rebuilds_mask(self, csv_dir, monkeypatch, source):
+        """Test reload_exclusions applies changed filters without reloading the CSV files."""
+        write_export(csv_dir / "a.csv", [("1", "-1,00", "Transfer"), ("2", "-2,00", "Grocery")])
+        loaded = server._reload_transactions()
+        assert loaded["excluded_count"] == 0
+
+        def visible_ids():
+            return sorted(row["id"] for row in server.search_transactions()["results"])
+
+        assert visible_ids() == ["1", "2"]
+
+        if source == "environment":
+            monkeypatch.setenv("EXCLUDED_CATEGORIES", "Transfer")
+        else:
+            dotenv = csv_dir / ".env"
+            dotenv.write_text("EXCLUDED_CATEGORIES=Transfer\n", encoding="utf-8")
+            monkeypatch.setattr(server, "_DOTENV_PATH", str(dotenv))
+            monkeypatch.setattr(server, "_PROCESS_ENV_KEYS", frozenset())
+            # Recorded so teardown removes the value the .env refresh sets
+            monkeypatch.setenv("EXCLUDED_CATEGORIES", "")
+        rebuilt = server._reload_exclusions()
+
+        assert rebuilt["generation"] == loaded["generation"] + 1
+        assert rebuilt["excluded_categories"] == ["Transfer"]
+        assert rebuilt["excluded_count"] == 1
+        assert rebuilt["total_records"] == 1
+        assert visible_ids() == ["2"]
+        health = server.health_check()
+        assert health["generation"] == rebuilt["generation"]
+        assert health["record_count"] == 1
+
+        if source == "environment":
+            monkeypatch.setenv("EXCLUDED_CATEGORIES", "Grocery")
+        else:
+            (csv_dir / ".env").write_text("EXCLUDED_CATEGORIES=Grocery\n", encoding="utf-8")
+        flipped = server._reload_exclusions()
+
+        assert flipped["generation"] == rebuilt["generation"] + 1
+        assert flipped["excluded_count"] == 1
+        assert visible_ids() == ["1"]
+
+        monkeypatch.setenv("EXCLUDED_CATEGORIES", "")
+        if source == "dotenv":
+            (csv_dir / ".env").write_text("", encoding="utf-8")
+        cleared = server._reload_exclusions()
+
+        assert cleared["generation"] == flipped["generation"] + 1
+        assert cleared["excluded_count"] == 0
+        assert visible_ids() == ["1", "2"]
@@ -0,0 +1,296 @@
+"""Unit tests for CSV ingestion helpers (file fingerprints, parsers, parsing)."""
+
+import gzip
+import os
+import zipfile
+from datetime import date
+
+import pytest
+
+from mcp_outbank.exclusion_filters import ExclusionMatcher
+from mcp_outbank.ingest import (
+    ContentIndex,
+    ParseCache,
+    chunked,
+    fingerprint_file,
+    load_file,
+    parse_cents,
+    parse_date,
+    parse_file,
+    parse_files,
+    same_content,
+    zstd_available,
+)
+from mcp_outbank.store import MISSING_DATE, TransactionStore
+from tests.mcp.conftest import EXPORT_HEADER, write_export
+
+
+class TestFileFingerprint:
+    def test_unchanged_stat_reuses_previous_fingerprint(self, tmp_path):
+        path = tmp_path / "export.csv"
+        path.write_text("a;b\n", encoding="utf-8")
+        first = fingerprint_file(path)
+
+        assert fingerprint_file(path, first) is first
+
+    def test_touched_file_keeps_same_content(self, tmp_path):
+        path = tmp_path / "export.csv"
+        path.write_text("a;b\n", encoding="utf-8")
+        first = fingerprint_file(path)
+        os.utime(path, ns=(first.mtime_ns + 1_000_000_000, first.mtime_ns + 1_000_000_000))
+
+        second = fingerprint_file(path, first)
+        assert second.mtime_ns != first.mtime_ns
+        assert same_content(second, first)
+
+    def test_modified_file_changes_content(self, tmp_path):
+        path = tmp_path / "export.csv"
+        path.write_text("a;b\n", encoding="utf-8")
+        first = fingerprint_file(path)
+        path.write_text("a;c\n", encoding="utf-8")
+        os.utime(path, ns=(first.mtime_ns + 1_000_000_000, first.mtime_ns + 1_000_000_000))
+
+        assert not same_content(fingerprint_file(path, first), first)
+
+
+class TestParseFiles:
+    def test_parse_file_skips_blank_rows_and_hides_duplicate_ids(self, tmp_path):
+        path = tmp_path / "a.csv"
+        write_export(path, [("1", "-1,50", "Food"), ("1", "-2,00", "Food")])
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(";;;;;;;;;;;;;;;\n")
+
+        parsed = parse_file(path)
+
+        assert parsed.total_parsed == 2
+        # Both copies are stored; the exclusion mask hides the repeated id
+        assert len(parsed.store) == 2
+        parsed.store.apply_exclusions(ExclusionMatcher())
+        assert list(parsed.store.visible(range(2))) == [0]
+        assert parsed.store.amounts[0] == -150
+
+    def test_parallel_parse_keeps_file_order(self, tmp_path):
+        paths = []
+        for index in range(4):
+            path = tmp_path / f"export_{index}.csv"
+            write_export(path, [(str(row), f"-{index},00", f"Cat {index}") for row in range(5)])
+            paths.append(path)
+
+        serial = [parsed.store.row(0) for parsed in parse_files(paths, workers=1)]
+        parallel = [parsed.store.row(0) for parsed in parse_files(paths, workers=2)]
+
+        assert parallel == serial
+        assert [row.source_file for row in parallel] == [path.name for path in paths]
+
+    def test_merged_store_reencodes_codes(self, tmp_path):
+        first = tmp_path / "a.csv"
+        second = tmp_path / "b.csv"
+        write_export(first, [("1", "-1,00", "Food")])
+        write_export(second, [("1", "-2,00", "Rent"), ("2", "-3,00", "Food")])
+
+        store = TransactionStore()
+        for parsed in parse_files([first, second]):
+            store.extend(parsed.store)
+
+        assert [store.category(index) for index in range(3)] == ["Food", "Rent", "Food"]
+        assert store.categories[0] == store.categories[2]
+        assert len(store.source_file_vocab) == 2
+
+
+class TestStreamingLoad:
+    def test_profiled_load_reports_each_stage(self, tmp_path):
+        path = tmp_path / "a.csv"
+        write_export(path, [(str(row), "-1,00", "Food") for row in range(20)])
+
+        plain = TransactionStore()
+        profiled = TransactionStore()
+        timings = {}
+        counts = load_file(path, profiled, chunk_size=7, timings=timings)
+
+        assert counts == load_file(path, plain)
+        assert list(timings) == ["read", "parse", "normalize", "store"]
+        assert all(value >= 0 for value in timings.values())
+        assert parse_file(path, profile=True).timings.keys() == timings.keys()
+        assert parse_file(path).timings is None
+
+    def test_chunked_yields_bounded_lists(self):
+        assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+        assert list(chunked([], 3)) == []
+
+    def test_small_chunks_match_single_chunk_load(self, tmp_path):
+        path = tmp_path / "a.csv"
+        write_export(
+            path,
+            [(str(row), f"-{row},00", "Rent" if row % 3 == 0 else "Food") for row in range(10)]
+            + [("4", "-9,99", "Food")],
+        )
+
+        whole = TransactionStore()
+        streamed = TransactionStore()
+        assert load_file(path, whole, chunk_size=1000) == 11
+        assert load_file(path, streamed, chunk_size=2) == 11
+
+        assert len(streamed) == 11
+        assert [streamed.row(i) for i in range(len(streamed))] == [
+            whole.row(i) for i in range(len(whole))
+        ]
+
+
+def _load_overlapping_exports(tmp_path, index):
+    """Load a monthly export and a yearly export that contains it, collapsing as we go."""
+    monthly = tmp_path / "a_monthly.csv"
+    yearly = tmp_path / "b_yearly.csv"
+    write_export(monthly, [("1", "-1,00", "Food"), ("2", "-1,00", "Food"), ("3", "-2,00", "Food")])
+    amounts = ["-1,00", "-2,00", "-3,00", "-1,00", "-1,00"]
+    write_export(yearly, [(str(row), amount, "Food") for row, amount in enumerate(amounts, 1)])
+
+    store = TransactionStore()
+    load_file(monthly, store)
+    collapsed = [index.collapse(store, 0)]
+    start = len(store)
+    load_file(yearly, store)
+    collapsed.append(index.collapse(store, start))
+    return store, start, collapsed
+
+
+class TestContentIndex:
+    def test_overlapping_exports_collapse_in_file_order(self, tmp_path):
+
+        store, start, collapsed = _load_overlapping_exports(tmp_path, ContentIndex())
+
+        # Two -1,00 rows and the -2,00 row already came from the monthly file;
+        # the third -1,00 and the -3,00 row are new
+        assert collapsed == [0, 3]
+        assert [store.row(i).id for i in range(start, len(store))] == ["3", "5"]
+
+    def test_reused_rows_restore_the_same_counts(self, tmp_path):
+        index = ContentIndex()
+        store, start, _ = _load_overlapping_exports(tmp_path, index)
+
+        replayed = ContentIndex()
+        replayed.add_collapsed(store, 0, start)
+        replayed.add_collapsed(store, start, len(store))
+
+        assert replayed.counts == index.counts
+
+
+class TestCompressedExports:
+    def _rows(self, path):
+        store = TransactionStore()
+        counts = load_file(path, store)
+        return counts, [store.row(i) for i in range(len(store))]
+
+    def test_gzip_streams_like_plain_csv(self, tmp_path):
+        plain = tmp_path / "export.csv"
+        write_export(plain, [("1", "-1,50", "Food"), ("2", "-2,00", "Rent")])
+        packed = tmp_path / "export.csv.gz"
+        packed.write_bytes(gzip.compress(plain.read_bytes()))
+
+        counts, rows = self._rows(packed)
+
+        assert (counts, [row.amount for row in rows]) == (
+            2,
+            [row.amount for row in self._rows(plain)[1]],
+        )
+        assert rows[0].source_file == "export.csv.gz"
+
+    def test_zip_members_load_in_name_order(self, tmp_path):
+        first = tmp_path / "a.csv"
+        second = tmp_path / "b.csv"
+        write_export(first, [("1", "-1,00", "Food")])
+        write_export(second, [("1", "-2,00", "Rent")])
+        archive = tmp_path / "exports.zip"
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+            handle.write(second, "2024/b.csv")
+            handle.write(first, "2024/a.csv")
+            handle.writestr("README.txt", "not an export")
+
+        counts, rows = self._rows(archive)
+
+        assert counts == 2
+        # Same row id in both members: record keys stay distinct per member
+        assert [row.record_key for row in rows] == [
+            "exports.zip/2024/a.csv:1",
+            "exports.zip/2024/b.csv:1",
+        ]
+
+    def test_zstd_streams_like_plain_csv(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        assert zstd_available()
+        plain = tmp_path / "export.csv"
+        write_export(plain, [("1", "-1,50", "Food")])
+        packed = tmp_path / "export.csv.zst"
+        packed.write_bytes(zstandard.ZstdCompressor().compress(plain.read_bytes()))
+
+        assert self._rows(packed)[0] == 1
+
+
+class TestIndexedRows:
+    def test_reordered_columns_resolve_by_header(self, tmp_path):
+        path = tmp_path / "a.csv"
+        columns = EXPORT_HEADER.strip().split(";")
+        reordered = [columns[4], *columns[:4], *columns[5:]]
+        path.write_text(
+            ";".join(reordered)
+            + "\n"
+            + "-1,50;7;DE00;18.01.2026;19.01.2026;EUR;Shop;123;Bank;Reason;Food;Sub;Food / Sub;"
+            "a, b;;Card payment\n",
+            encoding="utf-8",
+        )
+
+        store = TransactionStore()
+        load_file(path, store)
+
+        row = store.row(0)
+        assert row.id == "7"
+        assert row.amount == -150
+        assert row.tags == ("a", "b")
+
+    def test_blank_rows_and_row_numbers_match_dict_reader(self, tmp_path):
+        path = tmp_path / "a.csv"
+        path.write_text(
+            EXPORT_HEADER
+            + "\n"  # empty line: not counted
+            + ";;;;;;;;;;;;;;;\n"  # all cells empty: counted, skipped
+            + ";DE00;18.01.2026\n"  # short row, no id: row number 2
+            + ";;;;;;;;;;;;;;;;;\n",  # surplus empty cells: kept, row number 3
+            encoding="utf-8",
+        )
+
+        store = TransactionStore()
+        assert load_file(path, store) == 2
+        assert [store.row(i).id for i in range(len(store))] == ["2", "3"]
+        assert store.row(0).amount is None
+
+
+class TestFastParsers:
+    def test_outbank_and_iso_dates_use_fixed_width_layouts(self):
+        assert parse_date("18.01.2026") == date(2026, 1, 18)
+        assert parse_date("2026-01-18") == date(2026, 1, 18)
+        assert parse_date(" 18.01.2026 ") == date(2026, 1, 18)
+
+    def test_other_formats_fall_back_to_format_chain(self):
+        assert parse_date("8.1.2026") == date(2026, 1, 8)
+        assert parse_date("2026-01-18T10:30:00") == date(2026, 1, 18)
+        assert parse_date("not a date") is None
+
+    def test_impossible_calendar_dates_are_rejected(self):
+        assert parse_date("31.02.2026") is None
+        assert parse_date("2026-13-01") is None
+
+    def test_amounts_parse_to_exact_cents(self):
+        assert parse_cents("-13,11") == -1311
+        assert parse_cents("-0,50") == -50
+        assert parse_cents("-1.234,56") == -123456
+        assert parse_cents(" 1 234,50 ") == 123450
+        assert parse_cents("12") == 1200
+        assert parse_cents("") is None
+        assert parse_cents("abc") is None
+        assert parse_cents("nan") is None
+
+    def test_parse_cache_memoizes_raw_values(self):
+        cache = ParseCache()
+        assert cache.date("18.01.2026") == date(2026, 1, 18).toordinal()
+        assert cache.amount("-13,11") == -1311
+        assert cache.date(None) == MISSING_DATE
+        assert set(cache.dates) == {"18.01.2026", None}
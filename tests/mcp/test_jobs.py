@@ -0,0 +1,86 @@
+"""Unit tests for single-flight background jobs."""
+
+import asyncio
+import threading
+
+import pytest
+
+from mcp_outbank.jobs import Job, SingleFlight
+
+
+class TestSingleFlight:
+    def test_concurrent_submits_share_one_run(self):
+        release = threading.Event()
+        calls = []
+
+        def reload(label):
+            calls.append(label)
+            release.wait(5)
+            return {"label": label}
+
+        flight = SingleFlight(reload, name="reload")
+        first = flight.submit("first")
+        second = flight.submit("second")
+
+        assert second is first
+        assert first.describe()["status"] == "running"
+        release.set()
+        assert first.future.result(5) == {"label": "first"}
+        assert calls == ["first"]
+        assert flight.last.describe()["result"] == {"label": "first"}
+
+    def test_new_run_starts_after_the_previous_finished(self):
+        flight = SingleFlight(lambda: "done", name="reload")
+        first = flight.submit()
+        first.future.result(5)
+
+        second = flight.submit()
+        second.future.result(5)
+
+        assert second is not first
+        assert (first.id, second.id) == ("reload-1", "reload-2")
+
+    def test_failure_is_reported_to_every_caller(self):
+        def reload():
+            raise ValueError("CSV folder not found")
+
+        job = SingleFlight(reload).submit()
+
+        with pytest.raises(ValueError):
+            job.future.result(5)
+        info = job.describe()
+        assert info["status"] == "failed"
+        assert info["error"] == "CSV folder not found"
+
+    def test_cancelled_waiter_does_not_cancel_the_shared_run(self):
+        release = threading.Event()
+
+        def reload():
+            release.wait(5)
+            return "done"
+
+        job = SingleFlight(reload).submit()
+
+        async def wait_then_cancel():
+            waiter = asyncio.ensure_future(asyncio.shield(asyncio.wrap_future(job.future)))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(wait_then_cancel())
+        assert not job.future.cancel()
+        assert job.describe()["status"] == "running"
+        release.set()
+        assert job.future.result(5) == "done"
+        assert job.describe()["status"] == "succeeded"
+
+    def test_cancelled_job_is_described_without_raising(self):
+        job = Job("reload-1")
+        job.future.cancel()
+        job.finished_at = job.started_at
+
+        info = job.describe()
+
+        assert info["status"] == "cancelled"
+        assert "error" not in info and "result" not in info
@@ -0,0 +1,147 @@
+"""In-process tests for reloading the CSV folder into a new generation."""
+
+import pytest
+
+from mcp_outbank import server
+from tests.mcp.conftest import write_export
+
+
+def _cold_reload() -> tuple[dict, set[str]]:
+    """Reload from scratch; return the stats and visible record keys.
+
+    The generation published before is restored afterwards, so the next
+    reload is still incremental.
+    """
+    current = server._GENERATION
+    server._GENERATION = None
+    try:
+        result = server._reload_transactions()
+        store = server._GENERATION.store
+        return result, store.record_keys(0, len(store), visible_only=True)
+    finally:
+        server._GENERATION = current
+
+
+class TestIncrementalReloadStats:
+    @pytest.mark.parametrize("excluded", [None, "Transfer"])
+    def test_stats_match_a_cold_reload(self, csv_dir, monkeypatch, excluded):
+        if excluded is not None:
+            monkeypatch.setenv("EXCLUDED_CATEGORIES", excluded)
+        # Id 5 repeats; its first copy is a transfer
+        write_export(
+            csv_dir / "a.csv",
+            [
+                ("1", "-1,50", "Food"),
+                ("2", "-2,00", "Transfer"),
+                ("3", "-3,00", "Food"),
+                ("5", "-5,00", "Transfer"),
+                ("5", "-5,50", "Food"),
+            ],
+        )
+        write_export(csv_dir / "b.csv", [("10", "-10,00", "Food"), ("11", "-11,00", "Transfer")])
+
+        first = server._reload_transactions()
+        _, keys = _cold_reload()
+        assert first["new_records"] == first["total_records"] == len(keys)
+        assert first["removed_records"] == 0
+
+        def check_step():
+            nonlocal keys
+            incremental = server._reload_transactions()
+            cold, new_keys = _cold_reload()
+            assert incremental["total_records"] == cold["total_records"] == len(new_keys)
+            assert incremental["new_records"] == len(new_keys - keys)
+            assert incremental["removed_records"] == len(keys - new_keys)
+            keys = new_keys
+            return incremental
+
+        # Modify: drop id 3 and the transfer copy of id 5, add id 4
+        write_export(
+            csv_dir / "a.csv",
+            [
+                ("1", "-1,50", "Food"),
+                ("2", "-2,00", "Transfer"),
+                ("4", "-4,00", "Food"),
+                ("5", "-5,50", "Food"),
+            ],
+        )
+        modified = check_step()
+        assert modified["new_records"] == 1
+        assert modified["removed_records"] == 1
+
+        # Delete
+        (csv_dir / "b.csv").unlink()
+        deleted = check_step()
+        assert deleted["new_records"] == 0
+        assert deleted["removed_records"] == (1 if excluded else 2)
+
+        # Add
+        write_export(csv_dir / "c.csv", [("20", "-20,00", "Food"), ("21", "-21,00", "Transfer")])
+        added = check_step()
+        assert added["new_records"] == (1 if excluded else 2)
+        assert added["removed_records"] == 0
+
+        # Unchanged folder
+        unchanged = check_step()
+        assert unchanged["new_records"] == unchanged["removed_records"] == 0
+
+    def test_changed_exclusions_count_hidden_and_shown_records(self, csv_dir, monkeypatch):
+        write_export(csv_dir / "a.csv", [("1", "-1,50", "Food"), ("2", "-2,00", "Transfer")])
+        server._reload_transactions()
+
+        monkeypatch.setenv("EXCLUDED_CATEGORIES", "Transfer")
+        hidden = server._reload_transactions()
+        assert hidden["total_records"] == _cold_reload()[0]["total_records"] == 1
+        assert (hidden["new_records"], hidden["removed_records"]) == (0, 1)
+
+        monkeypatch.setenv("EXCLUDED_CATEGORIES", "Food")
+        swapped = server._reload_transactions()
+        assert swapped["total_records"] == _cold_reload()[0]["total_records"] == 1
+        assert (swapped["new_records"], swapped["removed_records"]) == (1, 1)
+
+
+class TestGenerationSwap:
+    def test_failed_reload_keeps_serving_the_previous_generation(self, csv_dir, monkeypatch):
+        write_export(csv_dir / "a.csv", [("1", "-1,50", "Food"), ("2", "-2,00", "Food")])
+        server._reload_transactions()
+        before = server.health_check()
+        results = server.search_transactions(query="shop", max_results=10)["results"]
+
+        write_export(csv_dir / "a.csv", [("3", "-3,00", "Food")])
+
+        def fail(*args, **kwargs):
+            raise OSError("disk went away")
+
+        monkeypatch.setattr(server, "_load_transactions", fail)
+        with pytest.raises(OSError, match="disk went away"):
+            server._reload_transactions()
+
+        after = server.health_check()
+        assert after["generation"] == before["generation"] == 1
+        assert after["record_count"] == before["record_count"] == 2
+        assert server.search_transactions(query="shop", max_results=10)["results"] == results
+
+    def test_request_keeps_its_generation_across_a_swap(self, csv_dir, monkeypatch):
+        write_export(csv_dir / "a.csv", [("1", "-1,50", "Food"), ("2", "-2,00", "Food")])
+        server._reload_transactions()
+        pinned = server._current_generation()
+        results = server.search_transactions(max_results=10)["results"]
+
+        scan_ranges = server._scan_ranges
+
+        def reload_mid_request(*args, **kwargs):
+            # Swap in a new generation after the request has read its own
+            write_export(csv_dir / "a.csv", [("3", "-3,00", "Food")])
+            server._reload_transactions()
+            return scan_ranges(*args, **kwargs)
+
+        monkeypatch.setattr(server, "_scan_ranges", reload_mid_request)
+        assert server.search_transactions(max_results=10)["results"] == results
+        monkeypatch.setattr(server, "_scan_ranges", scan_ranges)
+
+        current = server._current_generation()
+        assert current.number == pinned.number + 1
+        assert current.store.record_keys(0, len(current.store)) == {"a.csv:3"}
+        # The old generation is untouched by the swap
+        assert pinned.store.record_keys(0, len(pinned.store)) == {"a.csv:1", "a.csv:2"}
+        assert [row["id"] for row in server.search_transactions(max_results=10)["results"]] == ["3"]
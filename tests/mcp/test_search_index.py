@@ -0,0 +1,140 @@
+"""Unit tests for the precomputed search text used by search_transactions."""
+
+import random
+
+import pytest
+
+from mcp_outbank.search_index import SearchIndex, similarity
+from mcp_outbank.store import TransactionStore
+from tests.mcp.conftest import make_transaction
+
+
+class TestSearchIndex:
+    def test_text_joins_normalized_fields(self):
+        store = TransactionStore()
+        store.append(
+            make_transaction(
+                account="DE00 Checking",
+                number="DE89370400440532013000",
+                reason=" Groceries Week 3 ",
+                name="REWE Markt",
+                category="Food",
+                subcategory="Groceries",
+                category_path="Food / Groceries",
+            )
+        )
+
+        index = SearchIndex(store)
+
+        assert index.text(0) == (
+            "de00 checking de89370400440532013000 groceries week 3 rewe markt "
+            "card payment food groceries food / groceries"
+        )
+
+    def test_rows_with_identical_text_share_one_entry(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1"))
+        store.append(make_transaction(id="2", amount=-999))
+        store.append(make_transaction(id="3", reason="Rent"))
+
+        index = SearchIndex(store)
+
+        assert len(index) == 3
+        assert list(index.codes) == [0, 0, 1]
+        assert len(index.texts) == 2
+
+    def test_matching_rows_follow_substring_and_word_matching(self):
+        store = TransactionStore()
+        groceries = {"category": "Food", "category_path": "Food / Groceries"}
+        store.append(
+            make_transaction(
+                id="1",
+                name="REWE Markt",
+                reason=" Groceries Week 3 ",
+                subcategory="Groceries",
+                **groceries,
+            )
+        )
+        store.append(
+            make_transaction(
+                id="2", name="Netflix", reason="Subscription", subcategory="TV", **groceries
+            )
+        )
+        store.append(
+            make_transaction(
+                id="3",
+                name="Shell",
+                reason="Fuel",
+                category="Car",
+                subcategory="Fuel",
+                category_path="Car / Fuel",
+            )
+        )
+
+        index = SearchIndex(store)
+
+        assert list(index.matching_rows("rewe")) == [0]
+        # Needle inside a word and word inside the needle
+        assert list(index.matching_rows("groc")) == [0, 1]
+        assert list(index.matching_rows("netflix premium")) == [1]
+        # A substring spanning two words, neither of which matches alone
+        assert list(index.matching_rows("ies wee")) == [0]
+        # Any word of the row inside the needle matches
+        assert list(index.matching_rows("debit card")) == [0, 1, 2]
+        assert list(index.matching_rows("zalando")) == []
+
+    def test_matching_rows_agree_with_a_substring_scan(self):
+        store = TransactionStore()
+        for row_id, reason in enumerate(["Parking zone 5", "Zone 12 ticket", "Parkhaus"]):
+            store.append(make_transaction(id=str(row_id), reason=reason))
+        index = SearchIndex(store)
+
+        for needle in ("park", "zone 1", "parking zone", "haus", "ticket zone"):
+            expected = [
+                row
+                for row in range(len(index))
+                if needle in index.text(row)
+                or any(needle in word or word in needle for word in index.text(row).split())
+            ]
+            assert list(index.matching_rows(needle)) == expected
+            assert index.matching_rows(needle) is index.matching_rows(needle)
+
+    @pytest.mark.parametrize("min_score", [0.55, 0.3, 0.7])
+    def test_index_matches_scoring_every_row(self, min_score):
+        """The token index and fuzzy bounds keep exactly what a full scan keeps."""
+        rng = random.Random(7)
+        store = TransactionStore()
+        words = ["rewe", "markt", "amazon", "mktp", "de", "gas", "card", "x", "payment", "1"]
+        for row_id in range(300):
+            store.append(
+                make_transaction(
+                    id=str(row_id),
+                    account=rng.choice(["", "DE00", "Checking DE00"]),
+                    number="",
+                    reason=" ".join(rng.choices(words, k=rng.randint(0, 3))),
+                    name=rng.choice(["", "Rewe", "Amazon EU", "Shell"]),
+                    posting_text=rng.choice(["", "Card"]),
+                    category="",
+                    subcategory="",
+                    category_path="",
+                )
+            )
+        index = SearchIndex(store)
+
+        # Near-copies of existing texts (last letter of every word changed)
+        # mostly match only fuzzily
+        typos = [
+            " ".join(word[:-1] + "q" for word in index.text(row).split())
+            for row in rng.sample(range(300), 8)
+        ]
+        needles = ["amzon", "rewe mrkt", "payment card", "gs", "amazon mktplace de", "zzz", *typos]
+        for needle in filter(None, needles):
+            scores = [similarity(needle, index.text(row)) for row in range(len(index))]
+            exact = [row for row, score in enumerate(scores) if score == 1.0]
+            fuzzy = {
+                index.codes[row]: score
+                for row, score in enumerate(scores)
+                if min_score <= score < 1.0
+            }
+            assert list(index.matching_rows(needle)) == exact
+            assert index.fuzzy_scores(needle, min_score) == fuzzy
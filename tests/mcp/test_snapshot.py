@@ -0,0 +1,90 @@
+"""Unit tests for the on-disk store snapshot."""
+
+import os
+import stat
+
+import pytest
+
+from mcp_outbank.ingest import FileFingerprint, LoadedFile
+from mcp_outbank.snapshot import read_snapshot, snapshot_path, write_snapshot
+from mcp_outbank.store import MISSING_DATE, Transaction, TransactionStore
+
+CONFIG = (False,)
+
+
+def _store() -> TransactionStore:
+    store = TransactionStore()
+    for row_id, amount, tags in (("1", -1311, ("commute", "work")), ("2", None, ())):
+        store.append(
+            Transaction(
+                id=row_id,
+                account="DE00",
+                booking_date=739634,
+                value_date=MISSING_DATE,
+                amount=amount,
+                currency="EUR",
+                name="Café Müller",
+                number="123",
+                bank="Bank",
+                reason="Reason",
+                category="Food",
+                subcategory="Groceries",
+                category_path="Food / Groceries",
+                tags=tags,
+                note="",
+                posting_text="Card payment",
+                source_file="export.csv",
+            )
+        )
+    return store
+
+
+def _registry() -> dict[str, LoadedFile]:
+    return {"/data/export.csv": LoadedFile(FileFingerprint(100, 42, "abc"), 0, 2, 4, 1)}
+
+
+class TestSnapshot:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "snapshot.bin"
+        store = _store()
+        write_snapshot(path, store, _registry(), CONFIG)
+
+        loaded = read_snapshot(path, CONFIG)
+
+        assert loaded is not None
+        loaded_store, registry = loaded
+        assert registry == _registry()
+        assert [loaded_store.row(i) for i in range(2)] == [store.row(i) for i in range(2)]
+        assert loaded_store.amounts.typecode == "q"
+
+    def test_different_load_config_is_stale(self, tmp_path):
+        path = tmp_path / "snapshot.bin"
+        write_snapshot(path, _store(), _registry(), CONFIG)
+
+        assert read_snapshot(path, (True,)) is None
+
+    def test_missing_or_corrupt_snapshot_is_ignored(self, tmp_path):
+        path = tmp_path / "snapshot.bin"
+        assert read_snapshot(path, CONFIG) is None
+
+        path.write_bytes(b"")
+        assert read_snapshot(path, CONFIG) is None
+
+        path.write_bytes(b"not a snapshot at all")
+        assert read_snapshot(path, CONFIG) is None
+
+    def test_snapshot_path_depends_on_source(self, tmp_path):
+        first = snapshot_path(tmp_path, tmp_path / "a", "*.csv")
+        second = snapshot_path(tmp_path, tmp_path / "b", "*.csv")
+
+        assert first.parent == tmp_path
+        assert first != second
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_snapshot_is_readable_by_owner_only(self, tmp_path):
+        path = tmp_path / "cache" / "snapshot.bin"
+        write_snapshot(path, _store(), _registry(), CONFIG)
+
+        assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+        assert list(path.parent.iterdir()) == [path]
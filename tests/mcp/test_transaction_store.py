@@ -0,0 +1,270 @@
+"""Unit tests for the columnar transaction store.
+
+These tests exercise the store directly, without CSV files or an MCP server.
+"""
+
+from mcp_outbank.exclusion_filters import ExclusionMatcher
+from mcp_outbank.store import (
+    MISSING_AMOUNT,
+    MISSING_DATE,
+    TransactionStore,
+    Vocabulary,
+)
+from tests.mcp.conftest import make_transaction
+
+
+class TestVocabulary:
+    def test_encode_reuses_codes(self):
+        vocab = Vocabulary()
+        assert vocab.encode("EUR") == 0
+        assert vocab.encode("USD") == 1
+        assert vocab.encode("EUR") == 0
+        assert len(vocab) == 2
+        assert vocab[1] == "USD"
+
+    def test_codes_containing_is_case_insensitive(self):
+        vocab = Vocabulary()
+        vocab.encode("DE00 Checking")
+        vocab.encode("DE99 Savings")
+        assert vocab.codes_containing("savings") == {1}
+        assert vocab.codes_containing("de") == {0, 1}
+
+
+class TestTransaction:
+    def test_get_reads_fields_like_a_mapping(self):
+        transaction = make_transaction(category="Food")
+
+        assert transaction.get("category") == "Food"
+        assert transaction.get("missing", "") == ""
+        assert not hasattr(transaction, "__dict__")
+
+
+class TestTransactionStore:
+    def test_row_round_trips_transaction_record(self):
+        store = TransactionStore()
+        transaction = make_transaction()
+        store.append(transaction)
+
+        assert len(store) == 1
+        assert store.row(0) == transaction
+        assert store.row(0).record_key == "export.csv:1"
+
+    def test_columns_hold_typed_values(self):
+        store = TransactionStore()
+        store.append(make_transaction())
+
+        assert store.amounts[0] == -1311
+        assert store.booking_dates[0] == 739634
+        assert store.account(0) == "DE00123456780000000000"
+
+    def test_missing_values_use_sentinels(self):
+        store = TransactionStore()
+        store.append(make_transaction(amount=None, booking_date=MISSING_DATE))
+
+        assert store.amounts[0] == MISSING_AMOUNT
+        assert store.booking_dates[0] == MISSING_DATE
+        row = store.row(0)
+        assert row.amount is None
+        assert row.booking_date == MISSING_DATE
+
+    def test_repeated_strings_share_codes(self):
+        store = TransactionStore()
+        for row_id in ("1", "2", "3"):
+            store.append(make_transaction(id=row_id))
+
+        assert len(store.category_vocab) == 1
+        assert list(store.categories) == [0, 0, 0]
+
+    def test_derived_store_copies_row_ranges_without_reencoding(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", category="Food"))
+        store.append(make_transaction(id="2", category="Rent"))
+        store.append(make_transaction(id="3", category="Food"))
+
+        derived = store.derive()
+        derived.extend_from(store, 1, 3)
+
+        assert len(derived) == 2
+        assert derived.row(0) == store.row(1)
+        assert derived.row(1) == store.row(2)
+        assert derived.record_keys(0, 2) == {"export.csv:2", "export.csv:3"}
+
+    def test_extend_rows_matches_row_by_row_append(self):
+        transactions = [
+            make_transaction(id="1", category="Food"),
+            make_transaction(id="2", category="Rent", amount=None, booking_date=MISSING_DATE),
+            make_transaction(id="3", category="Food", tags=()),
+        ]
+        appended = TransactionStore()
+        for transaction in transactions:
+            appended.append(transaction)
+        extended = TransactionStore()
+        extended.extend_rows(transactions)
+
+        assert [extended.row(i) for i in range(3)] == [appended.row(i) for i in range(3)]
+        assert list(extended.categories) == list(appended.categories)
+
+    def test_counterparties_and_tags_are_dictionary_coded(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", name="Shop", tags=("a", "b")))
+        store.append(make_transaction(id="2", name="Shop", tags=()))
+        store.append(make_transaction(id="3", name="Shop", tags=("a", "b")))
+
+        assert list(store.names) == [0, 0, 0]
+        assert list(store.tag_sets) == [0, 1, 0]
+        assert store.tags(0) == ("a", "b")
+        assert store.tags(1) == ()
+        assert store.vocabularies()["name"] == ["Shop"]
+        assert store.vocabularies()["tags"] == ["a,b", ""]
+
+    def test_row_ranges_prune_files_by_date_and_account(self):
+        store = TransactionStore()
+        # January file on one account, March file on another, one undated row
+        store.append(make_transaction(id="1", booking_date=739617, account="A"))  # 2026-01-01
+        store.append(make_transaction(id="2", booking_date=739647, account="A"))  # 2026-01-31
+        store.add_partition(0, 2)
+        store.append(make_transaction(id="3", booking_date=739676, account="B"))  # 2026-03-01
+        store.append(make_transaction(id="4", booking_date=MISSING_DATE, account="B"))
+        store.add_partition(2, 4)
+
+        assert store.partitions[1].min_date == 739676
+        assert store.partitions[1].max_date == 739676
+        assert store.row_ranges() == [range(0, 2), range(2, 4)]
+        assert store.row_ranges(date_start=739648) == [range(2, 4)]
+        assert store.row_ranges(date_end=739647) == [range(0, 2)]
+        assert store.row_ranges(739648, 739675) == []
+        b_code = store.account_vocab.code_of("B")
+        assert store.row_ranges(account_codes={b_code}) == [range(2, 4)]
+
+    def test_row_ranges_without_partitions_cover_all_rows(self):
+        store = TransactionStore()
+        store.append(make_transaction())
+
+        assert store.row_ranges(date_start=1) == [range(0, 1)]
+
+    def test_exclusion_mask_hides_rows_without_dropping_them(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", category="Transfer"))
+        store.append(make_transaction(id="2", category="Food", tags=("internal-transfer",)))
+        store.append(make_transaction(id="3", category="Food", tags=()))
+        store.append(make_transaction(id="4", category="Food", category_path="Cash / Transfer"))
+
+        assert store.apply_exclusions(ExclusionMatcher(["transfer"], [])) == 2
+        assert list(store.excluded) == [1, 0, 0, 1]
+        assert list(store.visible(range(4))) == [1, 2]
+        assert store.visible_count() == 2
+        assert len(store) == 4
+
+        assert store.apply_exclusions(ExclusionMatcher([], ["transfer"])) == 1
+        assert list(store.visible(range(4))) == [0, 2, 3]
+
+        assert store.apply_exclusions(ExclusionMatcher()) == 0
+        assert list(store.visible(range(4))) == [0, 1, 2, 3]
+
+    def test_query_mask_combines_configured_and_per_query_exclusions(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", category="Transfer"))
+        store.append(make_transaction(id="2", category="Food", tags=("savings",)))
+        store.append(make_transaction(id="3", category="Rent", tags=()))
+        store.apply_exclusions(ExclusionMatcher(["transfer"], []))
+
+        hidden = store.query_mask(tags=["savings"])
+        assert list(store.visible(range(3), hidden)) == [2]
+        assert store.pattern_mask(tag="savings") == bytes([0, 1, 0])
+
+        hidden = store.query_mask(categories=["rent"], include_excluded=True)
+        assert list(store.visible(range(3), hidden)) == [0, 1]
+        assert list(store.visible(range(3), store.query_mask(include_excluded=True))) == [0, 1, 2]
+        assert store.query_mask() is store.excluded
+
+    def test_with_exclusions_leaves_the_original_mask_alone(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", category="Transfer"))
+        store.append(make_transaction(id="2", category="Food"))
+        store.apply_exclusions(ExclusionMatcher(["transfer"], []))
+
+        clone = store.with_exclusions(ExclusionMatcher(["food"], []))
+
+        assert list(store.visible(range(2))) == [1]
+        assert list(clone.visible(range(2))) == [0]
+        assert clone.ids is store.ids
+
+    def test_sorted_index_finds_date_ranges_by_bisect(self):
+        store = TransactionStore()
+        dates = [739676, 739617, MISSING_DATE, 739647, 739617]  # Mar 1, Jan 1, -, Jan 31, Jan 1
+        for row_id, booking_date in enumerate(dates):
+            store.append(make_transaction(id=str(row_id), booking_date=booking_date))
+
+        index = store.sorted_index("booking_dates")
+
+        # Undated rows are left out; equal dates keep row order
+        assert list(index.rows) == [1, 4, 3, 0]
+        assert list(index.between(739617, 739647)) == [1, 4, 3]
+        assert list(index.between(739618, 739647)) == [3]
+        assert list(index.between(739648)) == [0]
+        assert list(index.between(high=739616)) == []
+        assert list(index.between()) == [1, 4, 3, 0]
+        assert store.sorted_index("booking_dates") is index
+
+    def test_sorted_index_is_rebuilt_after_rows_are_added(self):
+        store = TransactionStore()
+        store.append(make_transaction(id="1", booking_date=739647))
+        assert list(store.sorted_index("booking_dates").between(739617, 739647)) == [0]
+
+        store.append(make_transaction(id="2", booking_date=739617))
+
+        assert list(store.sorted_index("booking_dates").between(739617, 739647)) == [1, 0]
+        clone = store.with_exclusions(ExclusionMatcher())
+        assert clone.sorted_index("booking_dates") is store.sorted_index("booking_dates")
+
+    def test_sorted_index_looks_up_exact_amounts_and_ranges(self):
+        store = TransactionStore()
+        amounts = [-4999, 1200, None, -4999, 0]
+        for row_id, amount in enumerate(amounts):
+            store.append(make_transaction(id=str(row_id), amount=amount))
+
+        index = store.sorted_index("amounts")
+
+        assert list(index.rows) == [0, 3, 4, 1]
+        assert list(index.equal(-4999)) == [0, 3]
+        assert list(index.equal(1200)) == [1]
+        assert list(index.equal(4999)) == []
+        assert list(index.between(-5000, 0)) == [0, 3, 4]
+        assert list(index.between(1)) == [1]
+        assert list(index.between(1, 0)) == []
+
+    def test_excluded_duplicate_does_not_shadow_visible_copy(self):
+        store = TransactionStore()
+        # Same record id twice: the first copy is excluded, the second is not
+        store.append(make_transaction(id="1", category="Transfer", amount=-500))
+        store.append(make_transaction(id="1", category="Food", amount=-700))
+        store.append(make_transaction(id="2", category="Food"))
+        store.append(make_transaction(id="2", category="Food"))
+
+        assert store.apply_exclusions(ExclusionMatcher(["transfer"], [])) == 1
+        assert list(store.visible(range(4))) == [1, 2]
+        assert store.visible_count() == 2
+        assert store.record_keys(0, 4, visible_only=True) == {"export.csv:1", "export.csv:2"}
+
+        # Without exclusions the first copy of each record id is shown
+        unfiltered = store.query_mask(include_excluded=True)
+        assert list(store.visible(range(4), unfiltered)) == [0, 2]
+        assert store.apply_exclusions(ExclusionMatcher()) == 0
+        assert list(store.visible(range(4))) == [0, 2]
+
+    def test_per_query_exclusion_does_not_shadow_later_copy(self):
+        store = TransactionStore()
+        # Same record id twice: only the first copy carries the per-query tag
+        store.append(make_transaction(id="183", tags=("work",), amount=-500))
+        store.append(make_transaction(id="183", tags=(), amount=-700))
+        store.append(make_transaction(id="184", tags=()))
+        store.apply_exclusions(ExclusionMatcher(["transfer"], []))
+
+        hidden = store.query_mask(tags=["work"])
+        assert list(store.visible(range(3), hidden)) == [1, 2]
+        # Same rows as configuring the tag as an exclusion
+        store.apply_exclusions(ExclusionMatcher([], ["work"]))
+        assert list(store.visible(range(3))) == [1, 2]
+
+        hidden = store.query_mask(tags=["work"], include_excluded=True)
+        assert list(store.visible(range(3), hidden)) == [1, 2]
@@ -0,0 +1,70 @@
+"""Unit tests for the background CSV folder watcher."""
+
+import threading
+
+from mcp_outbank.watcher import FolderWatcher, folder_signature
+
+
+def _wait_for(event: threading.Event, timeout: float = 5.0) -> bool:
+    return event.wait(timeout)
+
+
+class TestFolderSignature:
+    def test_only_matching_files_are_included(self, tmp_path):
+        (tmp_path / "a.csv").write_text("x", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("y", encoding="utf-8")
+
+        signature = folder_signature(tmp_path, "*.csv")
+
+        assert list(signature) == [str(tmp_path / "a.csv")]
+        assert signature[str(tmp_path / "a.csv")][0] == 1
+
+
+class TestFolderWatcher:
+    def test_polling_reloads_after_files_settle(self, tmp_path):
+        reloaded = threading.Event()
+        watcher = FolderWatcher(
+            tmp_path,
+            "*.csv",
+            reloaded.set,
+            debounce_seconds=0.05,
+            poll_interval=0.05,
+            use_inotify=False,
+        )
+        watcher.start()
+        try:
+            (tmp_path / "export.csv").write_text("data", encoding="utf-8")
+            assert _wait_for(reloaded)
+        finally:
+            watcher.stop(timeout=5)
+
+    def test_unrelated_files_do_not_trigger_reload(self, tmp_path):
+        calls = []
+        watcher = FolderWatcher(
+            tmp_path, "*.csv", lambda: calls.append(1), debounce_seconds=0.01, use_inotify=False
+        )
+        watcher.start()
+        watcher.stop(timeout=5)
+        (tmp_path / "notes.txt").write_text("y", encoding="utf-8")
+
+        watcher._settle_and_reload()
+
+        assert calls == []
+
+    def test_failed_reload_is_retried(self, tmp_path):
+        attempts = []
+
+        def flaky_reload():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ValueError("export.csv is missing headers: Amount")
+
+        watcher = FolderWatcher(tmp_path, "*.csv", flaky_reload, debounce_seconds=0.01)
+        watcher._applied = {}
+        (tmp_path / "export.csv").write_text("data", encoding="utf-8")
+
+        watcher._settle_and_reload()
+        watcher._settle_and_reload()
+        watcher._settle_and_reload()
+
+        assert len(attempts) == 2